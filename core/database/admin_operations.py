@@ -204,8 +204,10 @@ class AdminOperations:
             keep_song.draws = preview['merged']['draws']
             
             # Update confidence intervals
-            keep_song.confidence_interval_lower = keep_song.rating - 2 * keep_song.rating_deviation
-            keep_song.confidence_interval_upper = keep_song.rating + 2 * keep_song.rating_deviation
+            for column, value in Song.confidence_interval(
+                keep_song.rating, keep_song.rating_deviation
+            ).items():
+                setattr(keep_song, column, value)
             
             # Update all comparisons referencing merge_song to point to keep_song
             session.query(Comparison).filter_by(song_a_id=merge_song_id).update({
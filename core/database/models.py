@@ -13,9 +13,10 @@ Schema supports:
 
 from sqlalchemy import (
     create_engine, Column, Integer, String, Float, Boolean, 
-    DateTime, Date, Text, ForeignKey, Table, UniqueConstraint
+    DateTime, Date, Text, ForeignKey, Table, UniqueConstraint, Index
 )
-from sqlalchemy.orm import declarative_base, relationship, sessionmaker
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import backref, declarative_base, relationship, sessionmaker
 from datetime import datetime
 
 Base = declarative_base()
@@ -34,6 +35,13 @@ class Song(Base):
     - "Like OOH-AHH" Korean vs Japanese → 2 songs, linked as variant
     """
     __tablename__ = 'songs'
+    __table_args__ = (
+        # Duel/search filters: language, category, originals only, min games
+        Index('ix_songs_lang_cat_orig_games', 'language', 'category', 'is_original', 'games_played'),
+        # Rankings: originals sorted by rating (games filter read from the index) or by RD
+        Index('ix_songs_orig_rating_games', 'is_original', 'rating', 'games_played'),
+        Index('ix_songs_orig_rd', 'is_original', 'rating_deviation'),
+    )
     
     # Primary Key
     song_id = Column(Integer, primary_key=True, autoincrement=True)
@@ -186,15 +194,38 @@ class Song(Base):
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
-    # Relationships
-    original = relationship('Song', remote_side=[song_id], backref='variants')
+    # Relationships (lazy='raise': no page reads these, so an accidental
+    # per-row lazy load fails loudly instead of issuing a hidden SELECT)
+    original = relationship(
+        'Song', remote_side=[song_id], lazy='raise',
+        backref=backref('variants', lazy='raise')
+    )
     """If this is a variant, link to the original song"""
     
-    album_appearances = relationship('AlbumTrack', back_populates='song', cascade='all, delete-orphan')
+    album_appearances = relationship(
+        'AlbumTrack', back_populates='song', cascade='all, delete-orphan', lazy='raise'
+    )
     """All albums this song appears on"""
     
-    comparisons_as_a = relationship('Comparison', foreign_keys='Comparison.song_a_id', back_populates='song_a')
-    comparisons_as_b = relationship('Comparison', foreign_keys='Comparison.song_b_id', back_populates='song_b')
+    comparisons_as_a = relationship(
+        'Comparison', foreign_keys='Comparison.song_a_id', back_populates='song_a', lazy='raise'
+    )
+    comparisons_as_b = relationship(
+        'Comparison', foreign_keys='Comparison.song_b_id', back_populates='song_b', lazy='raise'
+    )
+    
+    @staticmethod
+    def confidence_interval(rating, rating_deviation) -> dict:
+        """
+        Column values for the 95% confidence interval (rating ± 2*RD)
+        
+        Accepts plain numbers or SQL expressions, so an UPDATE can derive the
+        bounds from the same values it assigns to rating and RD.
+        """
+        return {
+            'confidence_interval_lower': rating - 2 * rating_deviation,
+            'confidence_interval_upper': rating + 2 * rating_deviation,
+        }
     
     def __repr__(self):
         return f"<Song(id={self.song_id}, name='{self.canonical_name}', language={self.language})>"
@@ -260,7 +291,7 @@ class AlbumTrack(Base):
     
     # Composite primary key
     album_id = Column(Integer, ForeignKey('albums.album_id'), primary_key=True)
-    song_id = Column(Integer, ForeignKey('songs.song_id'), primary_key=True)
+    song_id = Column(Integer, ForeignKey('songs.song_id'), primary_key=True, index=True)
     track_number = Column(Integer, nullable=False, primary_key=True)
     """Track number within the album"""
     
@@ -496,31 +527,48 @@ def create_database(database_url: str):
     Returns:
         SQLAlchemy engine
     """
-    engine = create_engine(database_url, echo=False)
+    engine_options = {
+        # Rows per multi-row INSERT when bulk inserting (songs, album tracks)
+        'insertmanyvalues_page_size': 1000,
+    }
+    if make_url(database_url).get_driver_name() == 'psycopg2':
+        # Also batch executemany UPDATEs (e.g. variant linking) on Postgres
+        engine_options['executemany_mode'] = 'values_plus_batch'
+    
+    engine = create_engine(database_url, echo=False, **engine_options)
     Base.metadata.create_all(engine)
+    
+    # create_all skips indexes on tables that already exist; add any missing
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(engine, checkfirst=True)
+    
     return engine
 
 
-def get_session(engine):
+def get_session(engine, **options):
     """
     Create a new database session
     
     Args:
         engine: SQLAlchemy engine
+        **options: Extra sessionmaker options (e.g. autoflush=False,
+                   expire_on_commit=False for bulk loads)
     
     Returns:
         SQLAlchemy session
     """
-    Session = sessionmaker(bind=engine)
+    Session = sessionmaker(bind=engine, **options)
     return Session()
 
 
-def initialize_parameters(session):
+def initialize_parameters(session, commit: bool = True):
     """
     Initialize default Glicko-2 parameters
     
     Args:
         session: SQLAlchemy session
+        commit: Commit immediately; pass False to leave it to the caller's transaction
     """
     default_params = [
         Parameter(param_name='tau', param_value=0.5, 
@@ -542,7 +590,10 @@ def initialize_parameters(session):
         if not existing:
             session.add(param)
     
-    session.commit()
+    if commit:
+        session.commit()
+    else:
+        session.flush()
 
 
 if __name__ == '__main__':
@@ -5,18 +5,73 @@ CRUD operations for songs, albums, comparisons, and playlists
 Provides clean interface to database without exposing SQLAlchemy details
 """
 
-from typing import List, Dict, Optional, Tuple
+from typing import List, Dict, Optional, Tuple, NamedTuple
 from datetime import datetime, timedelta
-from sqlalchemy import desc, asc, func, and_, or_
-from sqlalchemy.orm import Session
+import pandas as pd
+from sqlalchemy import desc, asc, func, and_, or_, case, update, select
+from sqlalchemy.orm import Session, raiseload
 
 from core.database.models import (
     Song, Album, AlbumTrack, Comparison, Playlist, PlaylistSong, 
     Parameter, YTMPlaylist, create_database, get_session
 )
+from core.services.glicko2_service import Glicko2Calculator
 from config import Config
 
 
+class SongView(NamedTuple):
+    """Read-only snapshot of the song fields the UI displays"""
+    song_id: int
+    canonical_name: str
+    artist_name: str
+    rating: float
+    rating_deviation: float
+    volatility: float
+    youtube_video_id: Optional[str]
+    language: str
+    category: str
+    games_played: int
+    wins: int
+    losses: int
+    draws: int
+
+
+class RankingView(NamedTuple):
+    """Columns of the Rankings page's DataFrame (its itertuples() rows have these fields)"""
+    song_id: int
+    canonical_name: str
+    artist_name: str
+    rating: float
+    rating_deviation: float
+    language: str
+    category: str
+    variant_type: Optional[str]
+    games_played: int
+    wins: int
+    losses: int
+    draws: int
+    youtube_music_url: Optional[str]
+
+
+class RecordedOutcome(NamedTuple):
+    """A stored comparison with both songs' (rating, rd, volatility) before and after"""
+    comparison_id: int
+    song_a_before: Tuple[float, float, float]
+    song_a_after: Tuple[float, float, float]
+    song_b_before: Tuple[float, float, float]
+    song_b_after: Tuple[float, float, float]
+    
+    @property
+    def delta_a(self) -> float:
+        """Song A's rating change"""
+        return self.song_a_after[0] - self.song_a_before[0]
+    
+    @property
+    def delta_b(self) -> float:
+        """Song B's rating change"""
+        return self.song_b_after[0] - self.song_b_before[0]
+
+
 class DatabaseOperations:
     """
     Database operations wrapper
@@ -38,6 +93,7 @@ class DatabaseOperations:
         self.database_url = database_url or Config.DATABASE_URL
         self.engine = create_database(self.database_url)
         self.Session = lambda: get_session(self.engine)
+        self.calculator = Glicko2Calculator()
     
     # =========================================================================
     # SONG OPERATIONS
@@ -67,7 +123,44 @@ class DatabaseOperations:
         """Get song by ID"""
         session = self.Session()
         try:
-            return session.query(Song).filter_by(song_id=song_id).first()
+            return session.query(Song).options(raiseload('*')).filter_by(song_id=song_id).first()
+        finally:
+            session.close()
+    
+    def get_songs(self, song_ids: List[int]) -> Dict[int, Song]:
+        """
+        Get several songs in one query
+        
+        Args:
+            song_ids: Song IDs to fetch
+        
+        Returns:
+            Dict of song_id -> Song (missing IDs are absent)
+        """
+        session = self.Session()
+        try:
+            songs = session.query(Song).options(raiseload('*')).filter(Song.song_id.in_(song_ids)).all()
+            return {song.song_id: song for song in songs}
+        finally:
+            session.close()
+    
+    def get_songs_view(self, song_ids: List[int]) -> Dict[int, SongView]:
+        """
+        Get display snapshots of several songs in one query
+        
+        Selects only the SongView columns, so no ORM instances are built.
+        
+        Args:
+            song_ids: Song IDs to fetch
+        
+        Returns:
+            Dict of song_id -> SongView (missing IDs are absent)
+        """
+        columns = [getattr(Song, field) for field in SongView._fields]
+        session = self.Session()
+        try:
+            rows = session.query(*columns).filter(Song.song_id.in_(song_ids)).all()
+            return {row.song_id: SongView._make(row) for row in rows}
         finally:
             session.close()
     
@@ -124,8 +217,8 @@ class DatabaseOperations:
                 song.last_compared = datetime.utcnow()
                 
                 # Update confidence interval
-                song.confidence_interval_lower = rating - 2 * rd
-                song.confidence_interval_upper = rating + 2 * rd
+                for column, value in Song.confidence_interval(rating, rd).items():
+                    setattr(song, column, value)
                 
                 session.commit()
         finally:
@@ -227,6 +320,45 @@ class DatabaseOperations:
         finally:
             session.close()
     
+    def get_song_ids(
+        self,
+        language: str = None,
+        category: str = None,
+        is_original: bool = None,
+        min_games: int = None
+    ) -> List[int]:
+        """
+        Get IDs of songs matching filters (no ORM objects are built)
+        
+        Args:
+            language: Filter by language
+            category: Filter by category
+            is_original: Filter originals vs variants
+            min_games: Minimum games played
+        
+        Returns:
+            List of matching song IDs
+        """
+        session = self.Session()
+        try:
+            q = session.query(Song.song_id)
+            
+            if language:
+                q = q.filter(Song.language == language)
+            
+            if category:
+                q = q.filter(Song.category == category)
+            
+            if is_original is not None:
+                q = q.filter(Song.is_original == is_original)
+            
+            if min_games is not None:
+                q = q.filter(Song.games_played >= min_games)
+            
+            return [song_id for (song_id,) in q.all()]
+        finally:
+            session.close()
+    
     # =========================================================================
     # COMPARISON OPERATIONS
     # =========================================================================
@@ -264,56 +396,53 @@ class DatabaseOperations:
         """
         session = self.Session()
         try:
-            # Determine winner
-            if outcome == 1.0:
-                winner_id = song_a_id
-            elif outcome == 0.0:
-                winner_id = song_b_id
-            else:
-                winner_id = None  # Draw
-            
-            # Calculate expected outcome (for upset detection)
-            from core.services.glicko2_service import Glicko2Calculator
-            calc = Glicko2Calculator()
-            expected = calc.win_probability(
-                song_a_before[0], song_a_before[1],
-                song_b_before[0], song_b_before[1]
+            comparison = self._build_comparison(
+                song_a_id, song_b_id, outcome, outcome_type,
+                song_a_before, song_a_after, song_b_before, song_b_after,
+                comparison_mode, was_sequential
             )
             
-            # Detect upset
-            was_upset = (expected < 0.4 and outcome == 1.0) or (expected > 0.6 and outcome == 0.0)
+            session.add(comparison)
+            session.commit()
+            session.refresh(comparison)
             
-            comparison = Comparison(
-                song_a_id=song_a_id,
-                song_b_id=song_b_id,
-                winner_id=winner_id,
-                outcome=outcome,
-                outcome_type=outcome_type,
-                
-                song_a_rating_before=song_a_before[0],
-                song_a_rd_before=song_a_before[1],
-                song_a_vol_before=song_a_before[2],
-                
-                song_a_rating_after=song_a_after[0],
-                song_a_rd_after=song_a_after[1],
-                song_a_vol_after=song_a_after[2],
-                
-                song_b_rating_before=song_b_before[0],
-                song_b_rd_before=song_b_before[1],
-                song_b_vol_before=song_b_before[2],
-                
-                song_b_rating_after=song_b_after[0],
-                song_b_rd_after=song_b_after[1],
-                song_b_vol_after=song_b_after[2],
-                
-                comparison_mode=comparison_mode,
-                was_sequential=was_sequential,
-                expected_outcome=expected,
-                rating_impact=abs(song_a_after[0] - song_a_before[0]),
-                was_upset=was_upset
+            return comparison
+        finally:
+            session.close()
+    
+    def apply_duel_outcome(
+        self,
+        song_a_id: int,
+        song_b_id: int,
+        outcome: float,
+        outcome_type: str,
+        song_a_before: Tuple[float, float, float],
+        song_a_after: Tuple[float, float, float],
+        song_b_before: Tuple[float, float, float],
+        song_b_after: Tuple[float, float, float],
+        comparison_mode: str = 'duel',
+        was_sequential: bool = False
+    ) -> Comparison:
+        """
+        Apply a comparison result in a single transaction
+        
+        Equivalent to update_song_rating and update_song_stats for both songs
+        followed by record_comparison, but as one UPDATE of both song rows plus
+        one INSERT, with a single commit.
+        
+        Args:
+            Same as record_comparison (outcome is from A's perspective)
+        
+        Returns:
+            Created Comparison object
+        """
+        session = self.Session()
+        try:
+            comparison = self._apply_outcome(
+                session, song_a_id, song_b_id, outcome, outcome_type,
+                song_a_before, song_a_after, song_b_before, song_b_after,
+                comparison_mode, was_sequential
             )
-            
-            session.add(comparison)
             session.commit()
             session.refresh(comparison)
             
@@ -321,6 +450,258 @@ class DatabaseOperations:
         finally:
             session.close()
     
+    def record_and_apply_outcome(
+        self,
+        song_a_id: int,
+        song_b_id: int,
+        outcome: float,
+        outcome_type: str,
+        comparison_mode: str = 'duel',
+        was_sequential: bool = False
+    ) -> Optional[RecordedOutcome]:
+        """
+        Rate a head-to-head result and store it in a single transaction
+        
+        Reads both songs' current ratings, computes the Glicko-2 update, then
+        applies it exactly like apply_duel_outcome.
+        
+        Args:
+            song_a_id: Song A ID
+            song_b_id: Song B ID
+            outcome: Outcome from A's perspective (1.0 = A wins)
+            outcome_type: Type of outcome
+            comparison_mode: Mode of comparison
+            was_sequential: Whether songs were played back-to-back
+        
+        Returns:
+            RecordedOutcome, or None if either song does not exist
+        """
+        session = self.Session()
+        try:
+            rows = session.query(
+                Song.song_id, Song.rating, Song.rating_deviation, Song.volatility
+            ).filter(Song.song_id.in_([song_a_id, song_b_id])).all()
+            before = {row.song_id: tuple(row[1:]) for row in rows}
+            if song_a_id not in before or song_b_id not in before:
+                return None
+            
+            song_a_before, song_b_before = before[song_a_id], before[song_b_id]
+            result_a, result_b = self.calculator.update_pair(
+                *song_a_before, *song_b_before, outcome
+            )
+            song_a_after = (result_a.rating, result_a.rating_deviation, result_a.volatility)
+            song_b_after = (result_b.rating, result_b.rating_deviation, result_b.volatility)
+            
+            comparison = self._apply_outcome(
+                session, song_a_id, song_b_id, outcome, outcome_type,
+                song_a_before, song_a_after, song_b_before, song_b_after,
+                comparison_mode, was_sequential
+            )
+            session.commit()
+            
+            return RecordedOutcome(
+                comparison.comparison_id,
+                song_a_before, song_a_after,
+                song_b_before, song_b_after
+            )
+        finally:
+            session.close()
+    
+    def _apply_outcome(
+        self,
+        session: Session,
+        song_a_id: int,
+        song_b_id: int,
+        outcome: float,
+        outcome_type: str,
+        song_a_before: Tuple[float, float, float],
+        song_a_after: Tuple[float, float, float],
+        song_b_before: Tuple[float, float, float],
+        song_b_after: Tuple[float, float, float],
+        comparison_mode: str,
+        was_sequential: bool
+    ) -> Comparison:
+        """Update both songs with one UPDATE and add the Comparison (caller commits)"""
+        rating_a, rd_a, vol_a = song_a_after
+        rating_b, rd_b, vol_b = song_b_after
+        
+        def per_song(value_a, value_b):
+            return self._per_song(song_a_id, song_b_id, value_a, value_b)
+        
+        wins, losses, draws = self._result_counts(outcome)
+        new_rating = per_song(rating_a, rating_b)
+        new_rd = per_song(rd_a, rd_b)
+        
+        session.execute(
+            update(Song)
+            .where(Song.song_id.in_([song_a_id, song_b_id]))
+            .values(
+                rating=new_rating,
+                rating_deviation=new_rd,
+                volatility=per_song(vol_a, vol_b),
+                **Song.confidence_interval(new_rating, new_rd),
+                last_compared=datetime.utcnow(),
+                games_played=Song.games_played + 1,
+                wins=Song.wins + per_song(*wins),
+                losses=Song.losses + per_song(*losses),
+                draws=Song.draws + per_song(*draws),
+            )
+        )
+        
+        comparison = self._build_comparison(
+            song_a_id, song_b_id, outcome, outcome_type,
+            song_a_before, song_a_after, song_b_before, song_b_after,
+            comparison_mode, was_sequential
+        )
+        session.add(comparison)
+        
+        return comparison
+    
+    def undo_comparison(
+        self,
+        comparison_id: int,
+        song_a_id: int,
+        song_b_id: int,
+        outcome: float,
+        song_a_before: Tuple[float, float, float],
+        song_b_before: Tuple[float, float, float]
+    ) -> bool:
+        """
+        Undo a comparison in a single transaction
+        
+        Marks the comparison undone, then restores both songs' ratings and
+        reverts their game counts with one UPDATE.
+        
+        Args:
+            comparison_id: Comparison to undo
+            song_a_id: Song A ID
+            song_b_id: Song B ID
+            outcome: Recorded outcome (from A's perspective)
+            song_a_before: Song A (rating, rd, volatility) before the comparison
+            song_b_before: Song B (rating, rd, volatility) before the comparison
+        
+        Returns:
+            True if undone, False if missing or already undone
+        """
+        session = self.Session()
+        try:
+            result = session.execute(
+                update(Comparison)
+                .where(Comparison.comparison_id == comparison_id, Comparison.is_undone == False)
+                .values(is_undone=True)
+            )
+            if result.rowcount == 0:
+                session.rollback()
+                return False
+            
+            rating_a, rd_a, vol_a = song_a_before
+            rating_b, rd_b, vol_b = song_b_before
+            
+            def per_song(value_a, value_b):
+                return self._per_song(song_a_id, song_b_id, value_a, value_b)
+            
+            wins, losses, draws = self._result_counts(outcome)
+            old_rating = per_song(rating_a, rating_b)
+            old_rd = per_song(rd_a, rd_b)
+            
+            session.execute(
+                update(Song)
+                .where(Song.song_id.in_([song_a_id, song_b_id]))
+                .values(
+                    rating=old_rating,
+                    rating_deviation=old_rd,
+                    volatility=per_song(vol_a, vol_b),
+                    **Song.confidence_interval(old_rating, old_rd),
+                    games_played=Song.games_played - 1,
+                    wins=Song.wins - per_song(*wins),
+                    losses=Song.losses - per_song(*losses),
+                    draws=Song.draws - per_song(*draws),
+                )
+            )
+            session.commit()
+            
+            return True
+        finally:
+            session.close()
+    
+    @staticmethod
+    def _per_song(song_a_id: int, song_b_id: int, value_a, value_b):
+        """CASE picking each song's own value in an UPDATE of both songs"""
+        return case({song_a_id: value_a, song_b_id: value_b}, value=Song.song_id)
+    
+    @staticmethod
+    def _result_counts(outcome: float) -> Tuple[Tuple[int, int], ...]:
+        """(wins, losses, draws) increments for songs A and B given A's outcome"""
+        outcome_b = 1.0 - outcome
+        return (
+            (int(outcome == 1.0), int(outcome_b == 1.0)),
+            (int(outcome == 0.0), int(outcome_b == 0.0)),
+            (int(outcome not in (0.0, 1.0)), int(outcome_b not in (0.0, 1.0))),
+        )
+    
+    def _build_comparison(
+        self,
+        song_a_id: int,
+        song_b_id: int,
+        outcome: float,
+        outcome_type: str,
+        song_a_before: Tuple[float, float, float],
+        song_a_after: Tuple[float, float, float],
+        song_b_before: Tuple[float, float, float],
+        song_b_after: Tuple[float, float, float],
+        comparison_mode: str,
+        was_sequential: bool
+    ) -> Comparison:
+        """Build (but do not add) a Comparison row with winner and upset detection"""
+        # Determine winner
+        if outcome == 1.0:
+            winner_id = song_a_id
+        elif outcome == 0.0:
+            winner_id = song_b_id
+        else:
+            winner_id = None  # Draw
+        
+        # Calculate expected outcome (for upset detection)
+        expected = self.calculator.win_probability(
+            song_a_before[0], song_a_before[1],
+            song_b_before[0], song_b_before[1]
+        )
+        
+        # Detect upset
+        was_upset = (expected < 0.4 and outcome == 1.0) or (expected > 0.6 and outcome == 0.0)
+        
+        comparison = Comparison(
+            song_a_id=song_a_id,
+            song_b_id=song_b_id,
+            winner_id=winner_id,
+            outcome=outcome,
+            outcome_type=outcome_type,
+            
+            song_a_rating_before=song_a_before[0],
+            song_a_rd_before=song_a_before[1],
+            song_a_vol_before=song_a_before[2],
+            
+            song_a_rating_after=song_a_after[0],
+            song_a_rd_after=song_a_after[1],
+            song_a_vol_after=song_a_after[2],
+            
+            song_b_rating_before=song_b_before[0],
+            song_b_rd_before=song_b_before[1],
+            song_b_vol_before=song_b_before[2],
+            
+            song_b_rating_after=song_b_after[0],
+            song_b_rd_after=song_b_after[1],
+            song_b_vol_after=song_b_after[2],
+            
+            comparison_mode=comparison_mode,
+            was_sequential=was_sequential,
+            expected_outcome=expected,
+            rating_impact=abs(song_a_after[0] - song_a_before[0]),
+            was_upset=was_upset
+        )
+        
+        return comparison
+    
     def get_recent_comparisons(self, limit: int = 10) -> List[Comparison]:
         """Get most recent comparisons"""
         session = self.Session()
@@ -341,6 +722,19 @@ class DatabaseOperations:
         finally:
             session.close()
     
+    def get_progress_counts(self) -> Tuple[int, int]:
+        """Get (total songs, total comparisons) in a single query"""
+        session = self.Session()
+        try:
+            total_songs, total_comparisons = session.query(
+                select(func.count()).select_from(Song).scalar_subquery(),
+                select(func.count()).select_from(Comparison)
+                .where(Comparison.is_undone == False).scalar_subquery(),
+            ).one()
+            return total_songs, total_comparisons
+        finally:
+            session.close()
+    
     # =========================================================================
     # RANKING OPERATIONS
     # =========================================================================
@@ -352,7 +746,11 @@ class DatabaseOperations:
         language: str = None,
         category: str = None,
         include_variants: bool = True,
-        min_games: int = 0
+        min_games: int = 0,
+        languages: List[str] = None,
+        categories: List[str] = None,
+        min_rating: float = None,
+        max_rating: float = None
     ) -> List[Song]:
         """
         Get song rankings with filters
@@ -364,35 +762,118 @@ class DatabaseOperations:
             category: Filter by category
             include_variants: Include variant songs
             min_games: Minimum games played
+            languages: Filter to any of these languages
+            categories: Filter to any of these categories
+            min_rating: Minimum rating
+            max_rating: Maximum rating
         
         Returns:
             List of songs sorted by criteria
         """
         session = self.Session()
         try:
-            query = session.query(Song)
-            
-            # Filters
-            if not include_variants:
-                query = query.filter_by(is_original=True)
-            
-            if language:
-                query = query.filter_by(language=language)
-            
-            if category:
-                query = query.filter_by(category=category)
-            
-            if min_games > 0:
-                query = query.filter(Song.games_played >= min_games)
-            
-            # Sorting
-            sort_field = getattr(Song, sort_by, Song.rating)
-            if ascending:
-                query = query.order_by(asc(sort_field))
-            else:
-                query = query.order_by(desc(sort_field))
-            
-            return query.all()
+            return self._rankings_query(
+                session.query(Song).options(raiseload('*')), sort_by, ascending, language, category,
+                include_variants, min_games, languages, categories, min_rating, max_rating
+            ).all()
+        finally:
+            session.close()
+    
+    def get_rankings_frame(
+        self,
+        sort_by: str = 'rating',
+        ascending: bool = False,
+        include_variants: bool = True,
+        min_games: int = 0,
+        languages: List[str] = None,
+        categories: List[str] = None,
+        min_rating: float = None,
+        max_rating: float = None
+    ) -> pd.DataFrame:
+        """
+        Get song rankings as a DataFrame with the RankingView columns
+        
+        Same filters and sorting as get_rankings, but the SELECT is read
+        straight into columns by pd.read_sql (no ORM instances or row tuples).
+        Missing variant types and YouTube URLs come back as "" rather than NaN.
+        
+        Returns:
+            DataFrame sorted by criteria
+        """
+        columns = [getattr(Song, field) for field in RankingView._fields]
+        session = self.Session()
+        try:
+            query = self._rankings_query(
+                session.query(*columns), sort_by, ascending, None, None,
+                include_variants, min_games, languages, categories, min_rating, max_rating
+            )
+            frame = pd.read_sql(query.statement, session.connection())
+            # NULL text would read back as NaN, which is truthy; use "" instead
+            optional = ['variant_type', 'youtube_music_url']
+            frame[optional] = frame[optional].fillna("")
+            return frame
+        finally:
+            session.close()
+    
+    @staticmethod
+    def _rankings_query(
+        query,
+        sort_by: str,
+        ascending: bool,
+        language: Optional[str],
+        category: Optional[str],
+        include_variants: bool,
+        min_games: int,
+        languages: Optional[List[str]],
+        categories: Optional[List[str]],
+        min_rating: Optional[float],
+        max_rating: Optional[float]
+    ):
+        """Apply the rankings filters and sort order to a songs query"""
+        # Filters
+        if not include_variants:
+            query = query.filter(Song.is_original == True)
+        
+        if language:
+            query = query.filter(Song.language == language)
+        
+        if category:
+            query = query.filter(Song.category == category)
+        
+        if languages:
+            query = query.filter(Song.language.in_(languages))
+        
+        if categories:
+            query = query.filter(Song.category.in_(categories))
+        
+        if min_games > 0:
+            query = query.filter(Song.games_played >= min_games)
+        
+        if min_rating is not None:
+            query = query.filter(Song.rating >= min_rating)
+        
+        if max_rating is not None:
+            query = query.filter(Song.rating <= max_rating)
+        
+        # Sorting
+        sort_field = getattr(Song, sort_by, Song.rating)
+        if ascending:
+            query = query.order_by(asc(sort_field))
+        else:
+            query = query.order_by(desc(sort_field))
+        
+        return query
+    
+    def get_rating_bounds(self) -> Optional[Tuple[float, float]]:
+        """Get (min rating, max rating) across all songs, or None if there are none"""
+        session = self.Session()
+        try:
+            min_rating, max_rating = session.query(
+                func.min(Song.rating), func.max(Song.rating)
+            ).one()
+            if min_rating is None:
+                return None
+            return min_rating, max_rating
         finally:
             session.close()
     
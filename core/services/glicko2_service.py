@@ -19,7 +19,11 @@ from typing import List, Tuple
 from dataclasses import dataclass
 
 
-@dataclass
+# 3/π², used by g(φ) on every expectation
+THREE_OVER_PI_SQUARED = 3 / math.pi**2
+
+
+@dataclass(slots=True)
 class RatingUpdate:
     """Result of a rating update"""
     rating: float
@@ -27,7 +31,7 @@ class RatingUpdate:
     volatility: float
 
 
-@dataclass
+@dataclass(slots=True)
 class Opponent:
     """Opponent information for a comparison"""
     rating: float
@@ -128,7 +132,7 @@ class Glicko2Calculator:
         Returns:
             g(phi) value between 0 and 1
         """
-        return 1 / math.sqrt(1 + 3 * phi**2 / math.pi**2)
+        return 1 / math.sqrt(1 + THREE_OVER_PI_SQUARED * phi * phi)
     
     def _E(self, mu: float, mu_j: float, phi_j: float) -> float:
         """
@@ -327,6 +331,73 @@ class Glicko2Calculator:
             volatility=new_sigma
         )
     
+    def _update_single(
+        self,
+        mu: float,
+        phi: float,
+        sigma: float,
+        g_opp: float,
+        expected: float,
+        outcome: float
+    ) -> RatingUpdate:
+        """
+        Steps 3-8 for a single game, given the opponent's precomputed g(φⱼ) and E
+        
+        Same result as update_rating with one opponent and no inactivity
+        """
+        v_inv = g_opp * g_opp * expected * (1 - expected)
+        v = 1 / v_inv if v_inv > 0 else float('inf')
+        
+        improvement = g_opp * (outcome - expected)
+        delta = v * improvement
+        
+        new_sigma = self._new_volatility(phi, sigma, v, delta)
+        phi_star_sq = phi * phi + new_sigma * new_sigma
+        new_phi = 1 / math.sqrt(1 / phi_star_sq + 1 / v)
+        new_mu = mu + new_phi * new_phi * improvement
+        
+        new_rating, new_rd = self._scale_to_glicko(new_mu, new_phi)
+        return RatingUpdate(rating=new_rating, rating_deviation=new_rd, volatility=new_sigma)
+    
+    def update_pair(
+        self,
+        rating_a: float,
+        rd_a: float,
+        vol_a: float,
+        rating_b: float,
+        rd_b: float,
+        vol_b: float,
+        outcome_a: float
+    ) -> Tuple[RatingUpdate, RatingUpdate]:
+        """
+        Update both sides of a single head-to-head game
+        
+        Equivalent to two update_rating calls (each with the other as the only
+        opponent), but converts scales and evaluates g(φ) once per song.
+        
+        Args:
+            rating_a, rd_a, vol_a: Song A's current rating, RD, volatility
+            rating_b, rd_b, vol_b: Song B's current rating, RD, volatility
+            outcome_a: Outcome from A's perspective (B gets 1 - outcome_a)
+        
+        Returns:
+            (update for A, update for B)
+        """
+        mu_a, phi_a = self._scale_to_glicko2(rating_a, rd_a)
+        mu_b, phi_b = self._scale_to_glicko2(rating_b, rd_b)
+        
+        g_a = self._g(phi_a)
+        g_b = self._g(phi_b)
+        
+        # Not complementary unless the RDs match: each side is weighted by the other's g
+        expected_a = 1 / (1 + math.exp(-g_b * (mu_a - mu_b)))
+        expected_b = 1 / (1 + math.exp(-g_a * (mu_b - mu_a)))
+        
+        return (
+            self._update_single(mu_a, phi_a, vol_a, g_b, expected_a, outcome_a),
+            self._update_single(mu_b, phi_b, vol_b, g_a, expected_b, 1.0 - outcome_a),
+        )
+    
     def win_probability(
         self,
         rating_a: float,
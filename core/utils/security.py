@@ -75,7 +75,9 @@ class SecurityUtils:
         video_id: str,
         width: str = "100%",
         height: int = 400,
-        autoplay: bool = False
+        autoplay: bool = False,
+        lazy: bool = False,
+        privacy_enhanced: bool = False
     ) -> Optional[str]:
         """
         Create safe YouTube embed iframe
@@ -85,6 +87,8 @@ class SecurityUtils:
             width: iframe width (CSS value)
             height: iframe height (pixels)
             autoplay: Enable autoplay
+            lazy: Defer loading the player until the iframe is near the viewport
+            privacy_enhanced: Use the youtube-nocookie.com embed domain
         
         Returns:
             Safe iframe HTML or None if video_id invalid
@@ -97,12 +101,14 @@ class SecurityUtils:
         
         # Build iframe with validated ID
         autoplay_param = "1" if autoplay else "0"
+        domain = "www.youtube-nocookie.com" if privacy_enhanced else "www.youtube.com"
+        loading_attrs = 'loading="lazy" referrerpolicy="no-referrer" ' if lazy else ""
         
         iframe = f'''<iframe 
             width="{width}" 
             height="{height}" 
-            src="https://www.youtube.com/embed/{safe_id}?autoplay={autoplay_param}" 
-            frameborder="0" 
+            src="https://{domain}/embed/{safe_id}?autoplay={autoplay_param}" 
+            {loading_attrs}frameborder="0" 
             allow="accelerometer; autoplay; clipboard-write; encrypted-media; gyroscope; picture-in-picture" 
             allowfullscreen>
         </iframe>'''
@@ -146,14 +152,18 @@ def safe_youtube_embed(
     video_id: str, 
     width: str = "100%",
     height: int = 400,
-    autoplay: bool = False
+    autoplay: bool = False,
+    lazy: bool = False,
+    privacy_enhanced: bool = False
 ) -> Optional[str]:
     """Create safe YouTube embed - convenience function"""
     return SecurityUtils.create_safe_youtube_embed(
         video_id, 
         width=width, 
         height=height, 
-        autoplay=autoplay
+        autoplay=autoplay,
+        lazy=lazy,
+        privacy_enhanced=privacy_enhanced
     )
 
 
@@ -18,30 +18,46 @@ logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
+# Remix/mix markers (these indicate variants)
+REMIX_MARKERS = (
+    'house', 'moombahton', 'remix', 'mix', 'version 1.0', 'version 2.0',
+    'sped up', 'slowed', 'acoustic', 'radio edit', 'extended',
+    'instrumental', 'inst'
+)
+
+# Language markers (these indicate language variants)
+LANGUAGE_MARKERS = {
+    'japanese': ('japanese ver', 'japan ver', 'jpn ver', '日本語', 'jp'),
+    'english': ('english ver', 'eng ver', 'en'),
+    'korean': ('korean ver', 'kor ver', 'kr'),
+}
+
+# These are informational, NOT variant markers
+INFO_MARKERS = (
+    'dahyun', 'mina', 'nayeon', 'jihyo', 'sana', 'momo',
+    'chaeyoung', 'tzuyu', 'jeongyeon',  # Member names
+    'rewind', 'heart shaker',  # English subtitles
+)
+
+# Compiled once at import, shared by every processor instance
+PARENTHETICAL_PATTERN = re.compile(r'\(([^)]+)\)')
+WHITESPACE_PATTERN = re.compile(r'\s+')
+
+# Marker lists as single literal alternations: one C-level scan per
+# parenthetical instead of one Python `in` test per marker
+REMIX_MARKER_PATTERN = re.compile('|'.join(map(re.escape, REMIX_MARKERS)))
+INFO_MARKER_PATTERN = re.compile('|'.join(map(re.escape, INFO_MARKERS)))
+
+
 class ImprovedSongProcessor:
     """Process songs with proper variant detection and deduplication"""
     
     def __init__(self):
-        # Remix/mix markers (these indicate variants)
-        self.remix_markers = [
-            'house', 'moombahton', 'remix', 'mix', 'version 1.0', 'version 2.0',
-            'sped up', 'slowed', 'acoustic', 'radio edit', 'extended',
-            'instrumental', 'inst'
-        ]
-        
-        # Language markers (these indicate language variants)
-        self.language_markers = {
-            'japanese': ['japanese ver', 'japan ver', 'jpn ver', '日本語', 'jp'],
-            'english': ['english ver', 'eng ver', 'en'],
-            'korean': ['korean ver', 'kor ver', 'kr']
-        }
-        
-        # These are informational, NOT variant markers
-        self.info_markers = [
-            'dahyun', 'mina', 'nayeon', 'jihyo', 'sana', 'momo', 
-            'chaeyoung', 'tzuyu', 'jeongyeon',  # Member names
-            'rewind', 'heart shaker',  # English subtitles
-        ]
+        self.remix_markers = REMIX_MARKERS
+        self.language_markers = LANGUAGE_MARKERS
+        self.info_markers = INFO_MARKERS
+        self.remix_pattern = REMIX_MARKER_PATTERN
+        self.info_pattern = INFO_MARKER_PATTERN
     
     def extract_parenthetical_content(self, title: str) -> List[Tuple[str, str]]:
         """
@@ -50,8 +66,11 @@ class ImprovedSongProcessor:
         Returns: List of (original, normalized) tuples
         Example: "CHESS (DAHYUN)" → [("DAHYUN", "dahyun")]
         """
-        pattern = r'\(([^)]+)\)'
-        matches = re.findall(pattern, title)
+        # Most titles have no parentheses: skip the regex entirely
+        if '(' not in title:
+            return []
+        
+        matches = PARENTHETICAL_PATTERN.findall(title)
         return [(m, m.lower().strip()) for m in matches]
     
     def classify_parenthetical(self, content: str, album: str) -> Optional[str]:
@@ -68,24 +87,20 @@ class ImprovedSongProcessor:
         content_lower = content.lower()
         
         # Check remix markers
-        for marker in self.remix_markers:
-            if marker in content_lower:
-                return 'remix'
+        if self.remix_pattern.search(content_lower):
+            return 'remix'
         
         # Check language markers
-        for lang, markers in self.language_markers.items():
-            for marker in markers:
-                if marker in content_lower:
-                    return 'language'
+        if self._marker_language(content_lower):
+            return 'language'
         
         # Feature credit
         if 'feat' in content_lower or 'ft' in content_lower:
             return 'feature'
         
         # Info markers (member names, subtitles)
-        for marker in self.info_markers:
-            if marker in content_lower:
-                return 'info'
+        if self.info_pattern.search(content_lower):
+            return 'info'
         
         # Check album context for remixes
         # e.g., if album is "Strategy 2.0", treat as remix album
@@ -95,129 +110,100 @@ class ImprovedSongProcessor:
         
         return None
     
-    def extract_base_title(self, title: str) -> str:
+    def _marker_language(self, content: str) -> Optional[str]:
+        """Return the first language whose marker appears in content"""
+        for lang, markers in self.language_markers.items():
+            for marker in markers:
+                if marker in content:
+                    return lang
+        return None
+    
+    def _remix_variant_type(self, content: str) -> str:
+        """Map a remix parenthetical to its specific variant type"""
+        if 'house' in content:
+            return 'remix_house'
+        elif 'moombahton' in content:
+            return 'remix_moombahton'
+        elif 'sped up' in content:
+            return 'sped_up'
+        elif 'slowed' in content:
+            return 'slowed'
+        elif 'acoustic' in content:
+            return 'acoustic'
+        elif 'inst' in content:
+            return 'instrumental'
+        return 'remix'
+    
+    def classify_song(self, title: str, album: str) -> Tuple[str, Optional[str], str]:
         """
-        Extract base title for grouping (removes only variant markers)
+        Compute canonical name, variant type and language in one pass
         
-        Example:
+        Each parenthetical is extracted and classified once, and the result
+        feeds all three outputs.
+        
+        Canonical name (used for grouping, NOT for display):
         - "Strategy (House)" → "Strategy"
         - "CHESS (DAHYUN)" → "CHESS (DAHYUN)"  ← Keeps member name
         - "알고 싶지 않아 (REWIND)" → "알고 싶지 않아 (REWIND)"  ← Keeps subtitle
-        """
-        base_title = title
-        
-        # Extract parentheticals
-        parens = self.extract_parenthetical_content(title)
-        
-        # Remove only remix/language variant markers
-        for original, normalized in parens:
-            classification = self.classify_parenthetical(normalized, "")
-            
-            if classification in ['remix', 'language']:
-                # Remove this parenthetical
-                base_title = base_title.replace(f"({original})", "").strip()
         
-        # Clean up extra spaces
-        base_title = re.sub(r'\s+', ' ', base_title).strip()
+        Variant type: None if original, otherwise remix_house, japanese_version, etc.
         
-        return base_title
-    
-    def detect_variant_type(self, title: str, album: str, language: str) -> Optional[str]:
-        """
-        Detect variant type from title and album context
+        Language priority:
+        1. Instrumental marker in title
+        2. Explicit language markers in title
+        3. Album language markers
+        4. Default to Korean
         
-        Returns: variant_type or None if original
+        Returns: (canonical_name, variant_type, language)
         """
         title_lower = title.lower()
-        album_lower = album.lower() if pd.notna(album) else ""
+        album_lower = album.lower()
+        album_is_remix = '2.0' in album or 'remix' in album_lower
         
-        # Extract parentheticals
-        parens = self.extract_parenthetical_content(title)
+        canonical = title
+        variant_type = None
+        title_language = None
         
-        for original, normalized in parens:
-            classification = self.classify_parenthetical(normalized, album)
+        for original, normalized in self.extract_parenthetical_content(title):
+            classification = self.classify_parenthetical(normalized, "")
+            paren_language = self._marker_language(normalized)
             
-            if classification == 'remix':
-                # Determine specific remix type
-                if 'house' in normalized:
-                    return 'remix_house'
-                elif 'moombahton' in normalized:
-                    return 'remix_moombahton'
-                elif 'sped up' in normalized:
-                    return 'sped_up'
-                elif 'slowed' in normalized:
-                    return 'slowed'
-                elif 'acoustic' in normalized:
-                    return 'acoustic'
-                elif 'inst' in normalized:
-                    return 'instrumental'
-                else:
-                    return 'remix'
+            # Remove only remix/language variant markers from the canonical name
+            if classification in ('remix', 'language'):
+                canonical = canonical.replace(f"({original})", "").strip()
             
-            elif classification == 'language':
-                # Determine language variant
-                for lang, markers in self.language_markers.items():
-                    for marker in markers:
-                        if marker in normalized:
-                            return f'{lang}_version'
-        
-        # Check album context
-        if '2.0' in album or 'remix' in album_lower:
-            if 'instrumental' not in title_lower:
-                return 'remix'
-        
-        return None
-    
-    def detect_language(self, title: str, album: str, artist: str) -> str:
-        """
-        Detect song language
-        
-        Priority:
-        1. Explicit language markers in title
-        2. Album language markers
-        3. Default to Korean for TWICE
-        """
-        title_lower = title.lower()
-        album_lower = album.lower() if pd.notna(album) else ""
+            if title_language is None:
+                title_language = paren_language
+            
+            if variant_type is None:
+                # Album context turns ambiguous parentheticals into remixes
+                if classification is None and album_is_remix:
+                    classification = 'remix'
+                
+                if classification == 'remix':
+                    variant_type = self._remix_variant_type(normalized)
+                elif classification == 'language':
+                    variant_type = f'{paren_language}_version'
         
-        # Check for instrumental
-        if 'inst' in title_lower or 'instrumental' in title_lower:
-            return 'instrumental'
+        # Clean up extra spaces
+        canonical = WHITESPACE_PATTERN.sub(' ', canonical).strip()
         
-        # Check explicit language markers
-        parens = self.extract_parenthetical_content(title)
-        for original, normalized in parens:
-            for lang, markers in self.language_markers.items():
-                for marker in markers:
-                    if marker in normalized:
-                        return lang
-        
-        # Check album markers
-        if 'japanese' in album_lower or 'japan' in album_lower or '#twice' in album_lower:
-            return 'japanese'
+        # Check album context
+        if variant_type is None and album_is_remix and 'instrumental' not in title_lower:
+            variant_type = 'remix'
+        
+        if 'inst' in title_lower:
+            language = 'instrumental'
+        elif title_language:
+            language = title_language
+        elif 'japanese' in album_lower or 'japan' in album_lower or '#twice' in album_lower:
+            language = 'japanese'
         elif 'english' in album_lower:
-            return 'english'
-        
-        # Default for TWICE
-        if 'twice' in artist.lower():
-            return 'korean'
-        
-        return 'korean'
-    
-    def create_canonical_name(self, title: str, album: str) -> str:
-        """
-        Create canonical name (keeps important info, removes variants)
-        
-        This is used for grouping, NOT for display
-        """
-        # Get base title (removes variant markers)
-        canonical = self.extract_base_title(title)
-        
-        # Normalize spaces and punctuation
-        canonical = re.sub(r'\s+', ' ', canonical)
-        canonical = canonical.strip()
+            language = 'english'
+        else:
+            language = 'korean'
         
-        return canonical
+        return canonical, variant_type, language
     
     def process_songs(self, input_file: Path, output_file: Path):
         """
@@ -239,71 +225,50 @@ class ImprovedSongProcessor:
         
         logger.info(f"Processing {len(df)} tracks...")
         
+        # Classify each song in a single pass over (title, album)
+        classified = pd.DataFrame(
+            [self.classify_song(title, album) for title, album in zip(df['title'], df['album'])],
+            columns=['canonical_name', 'variant_type', 'language'],
+            index=df.index,
+        )
+        
         # Add new columns
         df['display_title'] = df['title']  # Keep original title
-        df['canonical_name'] = ''
-        df['variant_type'] = None
-        df['is_original'] = True
-        df['language'] = 'korean'
+        df['canonical_name'] = classified['canonical_name']
+        df['variant_type'] = classified['variant_type']
+        df['is_original'] = df['variant_type'].isna()
+        df['language'] = classified['language']
         df['original_video_id'] = None
         
-        # Process each song
-        for idx, row in df.iterrows():
-            title = row['title']
-            album = row.get('album', '')
-            artist = row.get('artists', 'TWICE')
-            
-            # Create canonical name (for grouping)
-            canonical = self.create_canonical_name(title, album)
-            df.at[idx, 'canonical_name'] = canonical
-            
-            # Detect variant type
-            variant_type = self.detect_variant_type(title, album, row.get('language', 'korean'))
-            df.at[idx, 'variant_type'] = variant_type
-            df.at[idx, 'is_original'] = (variant_type is None)
-            
-            # Detect language
-            language = self.detect_language(title, album, artist)
-            df.at[idx, 'language'] = language
-        
         # Group by video_id (same video_id = exact same song)
         logger.info("Removing exact duplicates (same video_id)...")
-        df_unique = df.drop_duplicates(subset=['video_id'], keep='first')
+        df_unique = df.drop_duplicates(subset=['video_id'], keep='first').copy()
         
         logger.info(f"Removed {len(df) - len(df_unique)} exact duplicates")
         
+        # Few distinct values across many rows: store as integer codes
+        for column in ('variant_type', 'language', 'artists'):
+            df_unique[column] = df_unique[column].astype('category')
+        
         # Now link variants to originals
         logger.info("Linking variants to originals...")
         
-        # Group by canonical_name + artists
-        groups = df_unique.groupby(['canonical_name', 'artists'])
+        # Rank candidates for "original" within each (canonical_name, artists) group:
+        # originals from a standard album (not remix album) first, then other
+        # originals, then variants. The stable sort keeps file order within a rank,
+        # so a group with no clear original falls back to its first row.
+        is_standard_album = ~df_unique['album'].str.contains('2.0|Remix', case=False, na=False)
+        original_rank = df_unique['is_original'].astype(int) * 2 + (df_unique['is_original'] & is_standard_album)
+        ranked = df_unique.loc[original_rank.sort_values(ascending=False, kind='stable').index]
         
-        variants_linked = 0
-        for (canonical, artists), group in groups:
-            if len(group) == 1:
-                continue
-            
-            # Find the original (no variant_type)
-            originals = group[group['is_original'] == True]
-            
-            if len(originals) == 0:
-                # No clear original, pick first one
-                original_id = group.iloc[0]['video_id']
-            elif len(originals) == 1:
-                original_id = originals.iloc[0]['video_id']
-            else:
-                # Multiple originals, pick the one from standard album (not remix album)
-                standard_albums = originals[~originals['album'].str.contains('2.0|Remix', case=False, na=False)]
-                if len(standard_albums) > 0:
-                    original_id = standard_albums.iloc[0]['video_id']
-                else:
-                    original_id = originals.iloc[0]['video_id']
-            
-            # Link variants to original
-            for idx, variant in group[group['is_original'] == False].iterrows():
-                df_unique.at[idx, 'original_video_id'] = original_id
-                variants_linked += 1
+        # Group by canonical_name + artists and broadcast each group's pick
+        original_ids = ranked.groupby(['canonical_name', 'artists'], sort=False, observed=True)['video_id'].transform('first')
+        
+        # Link variants to original (singletons have nothing to link to)
+        is_linked = ~ranked['is_original'] & (original_ids != ranked['video_id'])
+        df_unique['original_video_id'] = original_ids.where(is_linked, None)
         
+        variants_linked = int(is_linked.sum())
         logger.info(f"Linked {variants_linked} variants to originals")
         
         # Summary statistics
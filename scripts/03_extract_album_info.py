@@ -4,11 +4,12 @@ Extract album information and enrich song metadata
 Creates albums table and links songs to albums
 """
 
+import numpy as np
 import pandas as pd
 import re
 from pathlib import Path
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional, Tuple
 
 
 class AlbumExtractor:
@@ -24,46 +25,72 @@ class AlbumExtractor:
                         'one more time', 'brand new girl', 'breakthrough', 'celebrate'],
             'studio': [],  # Default fallback
         }
-    
-    def parse_album_type(self, album_name: str) -> str:
-        """Determine album type from name"""
-        if not album_name:
-            return 'single'
-        
-        album_lower = album_name.lower()
-        
-        for album_type, keywords in self.album_type_keywords.items():
-            if any(keyword in album_lower for keyword in keywords):
-                return album_type
         
-        # Default logic
-        if 'twice' in album_lower or 'formula' in album_lower or 'eyes wide open' in album_lower:
-            return 'studio'
+        # Names that mark a studio album when no type keyword matched
+        self.studio_keywords = ['twice', 'formula', 'eyes wide open']
         
-        return 'ep'  # Default for unknown
+        # Language markers
+        self.japanese_album_keywords = ['#twice', 'bdz', '&twice', 'candy pop',
+                                        'wake me up', 'breakthrough']
+        self.english_singles = ['the feels', 'moonlight sunrise', 'strategy', 'i got you']
     
-    def detect_album_language(self, album_name: str) -> str:
-        """Detect album's primary language"""
-        if not album_name:
-            return 'korean'
-        
-        album_lower = album_name.lower()
+    @staticmethod
+    def _contains_any(names_lower: pd.Series, keywords: List[str]) -> np.ndarray:
+        """Boolean mask of names containing any keyword (one regex pass)"""
+        if not keywords:
+            return np.zeros(len(names_lower), dtype=bool)
+        pattern = '|'.join(map(re.escape, keywords))
+        return names_lower.str.contains(pattern, regex=True).to_numpy(dtype=bool)
+    
+    def classify_albums(self, album_names: pd.Series) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Determine album type and primary language for every album at once
         
-        # Japanese albums
-        if any(jp in album_lower for jp in ['#twice', 'bdz', '&twice', 'candy pop', 
-                                             'wake me up', 'breakthrough']):
-            return 'japanese'
+        Names are lowercased once; each keyword list becomes one boolean
+        mask and np.select picks the first matching label per album.
         
-        # English singles
-        if album_lower in ['the feels', 'moonlight sunrise', 'strategy', 'i got you']:
-            return 'english'
+        Returns:
+            (album_types, languages) arrays aligned with album_names
+        """
+        names_lower = album_names.fillna('').str.lower()
+        is_empty = (names_lower == '').to_numpy()
         
-        return 'korean'
+        # Album type: keyword lists in priority order, then studio fallback
+        type_conditions = [is_empty]
+        type_choices = ['single']
+        for album_type, keywords in self.album_type_keywords.items():
+            type_conditions.append(self._contains_any(names_lower, keywords))
+            type_choices.append(album_type)
+        type_conditions.append(self._contains_any(names_lower, self.studio_keywords))
+        type_choices.append('studio')
+        album_types = np.select(type_conditions, type_choices, default='ep')  # Default for unknown
+        
+        # Language: Japanese albums, then English singles, else Korean
+        languages = np.select(
+            [
+                self._contains_any(names_lower, self.japanese_album_keywords),
+                names_lower.isin(self.english_singles).to_numpy(),
+            ],
+            ['japanese', 'english'],
+            default='korean'
+        )
+        
+        return album_types, languages
     
-    def run(self, input_file: str = 'data/ytm_deduplicated.csv', output_dir: str = 'data') -> tuple:
+    def run(
+        self,
+        input_file: str = 'data/ytm_deduplicated.csv',
+        output_dir: str = 'data',
+        df: Optional[pd.DataFrame] = None
+    ) -> tuple:
         """
         Extract album information
         
+        Args:
+            input_file: Deduplicated songs CSV (from script 02)
+            output_dir: Directory for output files
+            df: Deduplicated songs already in memory; skips reading input_file
+        
         Returns:
             (songs_df, albums_df) tuple
         """
@@ -72,42 +99,33 @@ class AlbumExtractor:
         print("=" * 60)
         
         # Load data
-        try:
-            df = pd.read_csv(input_file)
-            print(f"\n✅ Loaded {len(df)} songs from: {input_file}")
-        except FileNotFoundError:
-            print(f"\n❌ Error: File not found: {input_file}")
-            return None, None
+        if df is not None:
+            print(f"\n✅ Using {len(df)} songs passed in-process")
+        else:
+            try:
+                df = pd.read_csv(input_file)
+                print(f"\n✅ Loaded {len(df)} songs from: {input_file}")
+            except FileNotFoundError:
+                print(f"\n❌ Error: File not found: {input_file}")
+                return None, None
         
         # Ensure language column exists (if not already added by deduplicator)
         if 'language' not in df.columns:
             print("  ⚠️  No language column found, using default 'korean'")
             df['language'] = 'korean'
         
-        # Extract unique albums
-        albums_data = []
-        seen_albums = set()
-        
-        for _, row in df.iterrows():
-            album_name = row.get('album', '')
-            if pd.isna(album_name) or album_name == '':
-                continue
-            
-            if album_name in seen_albums:
-                continue
-            
-            seen_albums.add(album_name)
-            
-            album_info = {
-                'album_name': album_name,
-                'album_type': self.parse_album_type(album_name),
-                'language': self.detect_album_language(album_name),
-                'artist_name': row.get('artists', 'TWICE'),
-            }
-            
-            albums_data.append(album_info)
-        
-        albums_df = pd.DataFrame(albums_data)
+        # Extract unique albums (first row of each album supplies the artist)
+        has_album = df['album'].notna() & (df['album'] != '')
+        albums_df = (
+            df.loc[has_album, ['album', 'artists']]
+            .drop_duplicates(subset=['album'], keep='first')
+            .rename(columns={'album': 'album_name', 'artists': 'artist_name'})
+            .reset_index(drop=True)
+        )
+        albums_df['album_type'], albums_df['language'] = self.classify_albums(albums_df['album_name'])
+        albums_df = albums_df[['album_name', 'album_type', 'language', 'artist_name']]
+        for column in ('album_type', 'language', 'artist_name'):
+            albums_df[column] = albums_df[column].astype('category')
         
         print(f"\n✅ Extracted {len(albums_df)} unique albums")
         print(f"\n  Album type distribution:")
@@ -18,7 +18,17 @@ from ytmusicapi import YTMusic
 import pandas as pd
 from pathlib import Path
 from typing import List, Dict, Optional
-from difflib import SequenceMatcher
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from rapidfuzz import fuzz, process
+
+
+@lru_cache(maxsize=None)
+def normalize_text(text: Optional[str]) -> str:
+    """Lowercase a title/artist for comparison (cached per unique string; '' if missing)"""
+    if not text:
+        return ''
+    return text.lower()
 
 
 class UserPlaylistImporter:
@@ -93,7 +103,15 @@ class UserPlaylistImporter:
     
     def similarity(self, a: str, b: str) -> float:
         """Calculate string similarity (0.0 to 1.0)"""
-        return SequenceMatcher(None, a.lower(), b.lower()).ratio()
+        # Identical inputs need no scoring
+        if a == b:
+            return 1.0
+        
+        a_norm, b_norm = normalize_text(a), normalize_text(b)
+        if a_norm == b_norm:
+            return 1.0
+        
+        return fuzz.ratio(a_norm, b_norm) / 100.0
     
     def get_playlist_tracks(self, playlist_id: str, playlist_name: str) -> List[Dict]:
         """
@@ -112,30 +130,19 @@ class UserPlaylistImporter:
         try:
             playlist = self.ytmusic.get_playlist(playlist_id, limit=None)
             
-            tracks = []
-            for track in playlist.get('tracks', []):
-                video_id = track.get('videoId')
-                if not video_id:
-                    continue
-                
-                # Get like status if available
-                like_status = track.get('likeStatus', 'INDIFFERENT')
-                
-                # Extract artists
-                artists = track.get('artists', [])
-                artist_names = ', '.join([a.get('name', '') for a in artists if a.get('name')])
-                
-                track_data = {
-                    'video_id': video_id,
-                    'title': track.get('title', ''),
-                    'artists': artist_names,
+            tracks = [
+                {
+                    'video_id': track['videoId'],
+                    'title': track.get('title') or '',
+                    'artists': ', '.join([a.get('name', '') for a in track.get('artists') or [] if a.get('name')]),
                     'album': track.get('album', {}).get('name', '') if track.get('album') else '',
-                    'like_status': like_status,
-                    'is_liked': like_status == 'LIKE',
+                    'like_status': track.get('likeStatus', 'INDIFFERENT'),
+                    'is_liked': track.get('likeStatus', 'INDIFFERENT') == 'LIKE',
                     'playlist_source': playlist_name,
                 }
-                
-                tracks.append(track_data)
+                for track in playlist.get('tracks', [])
+                if track.get('videoId')
+            ]
             
             print(f"   ✅ Found {len(tracks)} tracks")
             return tracks
@@ -157,27 +164,19 @@ class UserPlaylistImporter:
             # Get liked songs (limit=None to get all)
             liked_songs = self.ytmusic.get_liked_songs(limit=None)
             
-            tracks = []
-            for track in liked_songs.get('tracks', []):
-                video_id = track.get('videoId')
-                if not video_id:
-                    continue
-                
-                # Extract artists
-                artists = track.get('artists', [])
-                artist_names = ', '.join([a.get('name', '') for a in artists if a.get('name')])
-                
-                track_data = {
-                    'video_id': video_id,
-                    'title': track.get('title', ''),
-                    'artists': artist_names,
+            tracks = [
+                {
+                    'video_id': track['videoId'],
+                    'title': track.get('title') or '',
+                    'artists': ', '.join([a.get('name', '') for a in track.get('artists') or [] if a.get('name')]),
                     'album': track.get('album', {}).get('name', '') if track.get('album') else '',
                     'like_status': 'LIKE',
                     'is_liked': True,
                     'playlist_source': 'Liked Music',
                 }
-                
-                tracks.append(track_data)
+                for track in liked_songs.get('tracks', [])
+                if track.get('videoId')
+            ]
             
             print(f"   ✅ Found {len(tracks)} liked songs")
             return tracks
@@ -219,28 +218,53 @@ class UserPlaylistImporter:
             'to_listen': [],  # To-listen playlist → 1525 Elo
         }
         
-        # Create video_id lookup for fast matching
-        video_id_map = {}
-        for idx, row in db_songs.iterrows():
-            if pd.notna(row.get('video_id')):
-                video_id_map[row['video_id']] = {
-                    'video_id': row['video_id'],
-                    'title': row['title'],
-                    'artists': row.get('artists', ''),
-                    'canonical_name': row.get('canonical_name', row['title']),
-                }
+        # Create video_id lookup for fast matching (column-wise, no per-row Series)
+        db_songs = db_songs.dropna(subset=['video_id'])
+        video_ids = db_songs['video_id'].to_numpy()
+        titles = db_songs['title'].to_numpy()
+        artists = db_songs.get('artists', pd.Series('', index=db_songs.index)).to_numpy()
+        canonical_names = db_songs.get('canonical_name', db_songs['title']).to_numpy()
+        
+        video_id_map = {
+            video_id: {
+                'video_id': video_id,
+                'title': title,
+                'artists': artist,
+                'canonical_name': canonical_name,
+            }
+            for video_id, title, artist, canonical_name
+            in zip(video_ids, titles, artists, canonical_names)
+        }
         
-        # Match user tracks
+        # Title lookups for the fallback, normalized once rather than per track
+        db_records = [video_id_map[video_id] for video_id in video_ids]
+        db_norm_titles = [
+            normalize_text(title) if isinstance(title, str) else ''
+            for title in titles
+        ]
+        title_map = {}
+        for norm_title, db_record in zip(db_norm_titles, db_records):
+            title_map.setdefault(norm_title, db_record)
+        
+        # Match user tracks, keeping one row per database song (its strongest
+        # boost) so two user tracks cannot boost the same song twice
+        boost_priority = {'to_listen': 0, 'familiar': 1, 'liked': 2}
+        best_matches = {}
         matched_count = 0
+        fuzzy_count = 0
         unmatched_count = 0
         
         for track in user_tracks:
             video_id = track['video_id']
             
-            # Try video_id match first
-            if video_id in video_id_map:
-                db_match = video_id_map[video_id]
-                
+            # Try video_id match first, then fall back to the title
+            db_match = video_id_map.get(video_id)
+            if db_match is None:
+                db_match = self.match_by_title(track, title_map, db_norm_titles, db_records)
+                if db_match is not None:
+                    fuzzy_count += 1
+            
+            if db_match is not None:
                 # Determine boost level
                 if track['is_liked']:
                     boost_level = 'liked'
@@ -250,7 +274,7 @@ class UserPlaylistImporter:
                     boost_level = 'familiar'
                 
                 match_info = {
-                    'video_id': video_id,
+                    'video_id': db_match['video_id'],
                     'user_title': track['title'],
                     'db_title': db_match['title'],
                     'canonical_name': db_match['canonical_name'],
@@ -259,16 +283,20 @@ class UserPlaylistImporter:
                     'boost_level': boost_level,
                 }
                 
-                matches[boost_level].append(match_info)
+                previous = best_matches.get(db_match['video_id'])
+                if previous is None or boost_priority[boost_level] > boost_priority[previous['boost_level']]:
+                    best_matches[db_match['video_id']] = match_info
                 matched_count += 1
             else:
-                # Could implement fuzzy matching here as fallback
                 unmatched_count += 1
         
+        for match_info in best_matches.values():
+            matches[match_info['boost_level']].append(match_info)
+        
         # Summary
         print(f"\n✅ Matching complete:")
-        print(f"   Matched: {matched_count} songs")
-        print(f"   Unmatched: {unmatched_count} songs")
+        print(f"   Matched: {matched_count} tracks ({fuzzy_count} by title) → {len(best_matches)} unique songs")
+        print(f"   Unmatched: {unmatched_count} tracks")
         print(f"\n   Boost distribution:")
         print(f"   ❤️  Liked (1600 Elo): {len(matches['liked'])} songs")
         print(f"   👀 Familiar (1550 Elo): {len(matches['familiar'])} songs")
@@ -276,6 +304,51 @@ class UserPlaylistImporter:
         
         return matches
     
+    def match_by_title(
+        self,
+        track: Dict,
+        title_map: Dict[str, Dict],
+        db_norm_titles: List[str],
+        db_records: List[Dict]
+    ) -> Optional[Dict]:
+        """
+        Fallback match for tracks whose video_id is not in the database
+        
+        Tries an exact normalized-title lookup first, then a token-sort fuzzy
+        match (score >= 90), which unlike token-set does not accept a title
+        that is only a subset of another ("Like" vs "Like OOH-AHH"). Both
+        sides must have an artist and it must match the same way, so liked
+        songs by other artists with the same title are not picked up.
+        
+        Returns:
+            Database record dict, or None if nothing matches
+        """
+        title = normalize_text(track.get('title'))
+        if not title:
+            return None
+        
+        db_match = title_map.get(title)
+        if db_match is None:
+            result = process.extractOne(
+                title, db_norm_titles, scorer=fuzz.token_sort_ratio, score_cutoff=90
+            )
+            if result is None:
+                return None
+            db_match = db_records[result[2]]
+        
+        # Confirm the artist; without one on either side the match is unverified
+        user_artists = track.get('artists') or ''
+        db_artists = db_match['artists']
+        if not user_artists or not isinstance(db_artists, str) or not db_artists:
+            return None
+        artist_score = fuzz.token_sort_ratio(
+            normalize_text(user_artists), normalize_text(db_artists)
+        )
+        if artist_score < 90:
+            return None
+        
+        return db_match
+    
     def run(
         self,
         db_file: str = 'data/ytm_enriched.csv',
@@ -304,22 +377,22 @@ class UserPlaylistImporter:
             print("   Run script 03 first: python scripts/03_extract_album_info.py")
             return {}
         
-        # Get user's playlists
-        all_user_tracks = []
-        
-        # 1. TWICE Favourites playlist
+        # Get user's playlists (independent network calls, fetched concurrently)
         favourites_id = 'PLhdZwGHaOH58pW4q3AzbkWO6s0qKXYTm3'
-        favourites = self.get_playlist_tracks(favourites_id, 'TWICE - Favourites')
-        all_user_tracks.extend(favourites)
-        
-        # 2. TWICE To-Listen playlist
         to_listen_id = 'PLhdZwGHaOH58FRwNe28AP0CnYkiBWajOn'
-        to_listen = self.get_playlist_tracks(to_listen_id, 'TWICE - To Listen')
-        all_user_tracks.extend(to_listen)
         
-        # 3. Liked Music (all songs, not just TWICE)
-        liked_music = self.get_liked_music()
-        all_user_tracks.extend(liked_music)
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            # 1. TWICE Favourites playlist
+            favourites = executor.submit(self.get_playlist_tracks, favourites_id, 'TWICE - Favourites')
+            
+            # 2. TWICE To-Listen playlist
+            to_listen = executor.submit(self.get_playlist_tracks, to_listen_id, 'TWICE - To Listen')
+            
+            # 3. Liked Music (all songs, not just TWICE)
+            liked_music = executor.submit(self.get_liked_music)
+            
+            # Keep the original source order for matching
+            all_user_tracks = favourites.result() + to_listen.result() + liked_music.result()
         
         print(f"\n📊 Total user tracks collected: {len(all_user_tracks)}")
         
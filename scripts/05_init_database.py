@@ -8,9 +8,13 @@ Key improvements:
 4. Album display in schema
 """
 
+import numpy as np
 import pandas as pd
+import re
+from collections import Counter
 from pathlib import Path
 from datetime import datetime
+from typing import Iterable
 import sys
 import logging
 
@@ -18,6 +22,8 @@ import logging
 project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
 
+from sqlalchemy import case, event, func, insert, select, text
+
 from core.database.models import create_database, get_session, initialize_parameters
 from core.database.models import Song, Album, AlbumTrack, YTMPlaylist
 from config import Config
@@ -25,6 +31,67 @@ from config import Config
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Category rules, compiled once (substring matches, case-insensitive)
+SOLO_ARTISTS = (
+    'nayeon', 'jihyo', 'sana', 'momo', 'dahyun', 'chaeyoung', 'tzuyu', 'mina', 'jeongyeon',
+)
+SOLO_ARTIST_PATTERN = re.compile('|'.join(map(re.escape, SOLO_ARTISTS)), re.IGNORECASE)
+SUBUNIT_PATTERN = re.compile('misamo', re.IGNORECASE)
+COLLABORATION_PATTERN = re.compile('[,&]|feat', re.IGNORECASE)
+
+# CSV columns read by insert_songs/insert_albums, with dtypes that skip
+# inference (low-cardinality labels as category). Durations keep inferred
+# ints so they bind as plain integers.
+SONG_COLUMN_DTYPES = {
+    'video_id': str,
+    'title': str,
+    'display_title': str,
+    'canonical_name': str,
+    'artists': str,
+    'album': str,
+    'youtube_music_url': str,
+    'youtube_url': str,
+    'thumbnail_url': str,
+    'is_original': bool,
+    'variant_type': 'category',
+    'original_video_id': str,
+    'language': 'category',
+    'duration_ms': None,
+    'duration_seconds': None,
+}
+
+# Songs are read and inserted in chunks of this many rows; only these
+# columns are kept across chunks for variant and album linking
+SONG_CHUNK_SIZE = 5000
+SONG_LINK_COLUMNS = ['video_id', 'is_original', 'original_video_id', 'album']
+
+ALBUM_COLUMN_DTYPES = {
+    'album_name': str,
+    'album_type': 'category',
+    'language': 'category',
+}
+
+
+def configure_bulk_load(engine):
+    """
+    Relax SQLite durability for the one-shot initialization load
+    
+    Safe here because a failed run is simply re-run from the CSV files.
+    """
+    if engine.dialect.name != 'sqlite':
+        return
+    
+    @event.listens_for(engine, 'connect')
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute('PRAGMA synchronous=OFF')
+        cursor.execute('PRAGMA journal_mode=MEMORY')
+        cursor.execute('PRAGMA temp_store=MEMORY')
+        cursor.close()
+    
+    # Drop connections opened by create_all so new ones get the pragmas
+    engine.dispose()
+
 
 class ImprovedDatabaseInitializer:
     """Initialize database with improved data handling"""
@@ -48,11 +115,11 @@ class ImprovedDatabaseInitializer:
         }
     
     def load_user_preferences(self):
-        """Load user's liked/familiar/to-listen songs"""
+        """Load user's liked/familiar/to-listen video IDs as arrays for Series.isin"""
         preferences = {
-            'liked': set(),
-            'familiar': set(),
-            'to_listen': set(),
+            'liked': np.array([], dtype=object),
+            'familiar': np.array([], dtype=object),
+            'to_listen': np.array([], dtype=object),
         }
         
         for pref_type, filepath in [
@@ -61,190 +128,225 @@ class ImprovedDatabaseInitializer:
             ('to_listen', self.to_listen_file),
         ]:
             if filepath.exists():
-                df = pd.read_csv(filepath)
-                video_ids = set(df['video_id'].dropna())
+                df = pd.read_csv(filepath, usecols=['video_id'], dtype={'video_id': str}, engine='c')
+                video_ids = df['video_id'].dropna().to_numpy()
                 preferences[pref_type] = video_ids
                 logger.info(f"   {pref_type}: {len(video_ids)} songs")
         
         return preferences
     
-    def determine_initial_elo(self, video_id: str, preferences: dict) -> tuple:
-        """Determine initial Elo rating and source"""
-        if video_id in preferences['liked']:
-            return self.elo_boosts['liked'], 'user_liked'
-        elif video_id in preferences['familiar']:
-            return self.elo_boosts['familiar'], 'user_familiar'
-        elif video_id in preferences['to_listen']:
-            return self.elo_boosts['to_listen'], 'to_listen'
-        else:
-            return self.elo_boosts['unknown'], 'unknown'
-    
-    def detect_category(self, artist_name: str) -> str:
-        """Detect song category from artist name"""
-        artist_lower = artist_name.lower()
-        
-        # Solo artists
-        solo_artists = ['nayeon', 'jihyo', 'sana', 'momo', 'dahyun', 
-                       'chaeyoung', 'tzuyu', 'mina', 'jeongyeon']
-        if any(solo in artist_lower for solo in solo_artists):
-            return 'Solo'
-        
-        # Subunits
-        if 'misamo' in artist_lower:
-            return 'Subunit'
-        
-        # Collaborations
-        if ',' in artist_name or '&' in artist_name or 'feat' in artist_lower:
-            return 'Collaboration'
-        
-        # Default: TWICE
-        return 'TWICE'
+    def determine_initial_elo(self, video_ids: pd.Series, preferences: dict) -> tuple:
+        """
+        Determine initial Elo rating and source for every song at once
+        
+        Priority: liked > familiar > to_listen > unknown
+        
+        Returns:
+            (ratings, sources) arrays aligned with video_ids
+        """
+        # Code each preferred video once (0 = unknown); higher-priority lists
+        # are applied last so they win, then one hash lookup per song
+        tiers = [
+            ('unknown', 'unknown'),
+            ('to_listen', 'to_listen'),
+            ('familiar', 'user_familiar'),
+            ('liked', 'user_liked'),
+        ]
+        code_by_video_id = {}
+        for code, (pref_type, _) in enumerate(tiers[1:], 1):
+            code_by_video_id.update(dict.fromkeys(preferences[pref_type], code))
+        
+        codes = video_ids.map(code_by_video_id).fillna(0).to_numpy(dtype=np.intp)
+        
+        ratings = np.array([self.elo_boosts[pref_type] for pref_type, _ in tiers], dtype='float64')[codes]
+        sources = np.array([source for _, source in tiers])[codes]
+        return ratings, sources
     
-    def insert_songs(self, session, songs_df: pd.DataFrame, preferences: dict):
+    def detect_categories(self, artists: pd.Series) -> np.ndarray:
         """
-        Insert songs into database
+        Detect song category from artist name for every song at once
         
-        Key: Uses display_title for user-facing name
+        Priority: Solo > Subunit > Collaboration > TWICE
         """
-        logger.info("\n📀 Inserting songs...")
+        return np.select(
+            [
+                artists.str.contains(SOLO_ARTIST_PATTERN, na=False).to_numpy(),
+                artists.str.contains(SUBUNIT_PATTERN, na=False).to_numpy(),
+                artists.str.contains(COLLABORATION_PATTERN, na=False).to_numpy(),
+            ],
+            ['Solo', 'Subunit', 'Collaboration'],
+            default='TWICE'
+        )
+    
+    def insert_song_chunk(self, session, songs_df: pd.DataFrame, preferences: dict) -> Counter:
+        """
+        Insert one chunk of songs into database
         
-        songs_created = 0
-        elo_distribution = {}
+        Key: Uses display_title for user-facing name
         
-        for _, row in songs_df.iterrows():
-            video_id = row.get('video_id')
-            initial_elo, elo_source = self.determine_initial_elo(video_id, preferences)
+        Returns:
+            Initial Elo distribution for the chunk as (source, rating) -> count
+        """
+        def column(name, default=None):
+            """Column from songs_df, or a constant Series if the CSV lacks it"""
+            if name in songs_df:
+                return songs_df[name]
+            return pd.Series(default, index=songs_df.index, dtype=object)
+        
+        video_ids = songs_df['video_id']
+        initial_elos, elo_sources = self.determine_initial_elo(video_ids, preferences)
+        artists = column('artists', 'TWICE')
+        
+        # Build every row column-wise, then hand plain dicts to the bulk insert
+        song_records = pd.DataFrame({
+            # Use display_title if available, otherwise canonical_name
+            'canonical_name': column('display_title', column('canonical_name', songs_df['title'])),
+            'youtube_music_url': column('youtube_music_url'),
+            'youtube_video_id': video_ids,
+            'youtube_url': column('youtube_url'),
+            'thumbnail_url': column('thumbnail_url'),
             
-            # Track distribution
-            elo_distribution[elo_source] = elo_distribution.get(elo_source, 0) + 1
+            # Variant info (will be linked in second pass)
+            'is_original': column('is_original', True),
+            'variant_type': column('variant_type'),
             
-            # Use display_title if available, otherwise canonical_name
-            display_name = row.get('display_title', row.get('canonical_name', row['title']))
+            # Language
+            'language': column('language', 'korean'),
             
-            # Create song
-            song = Song(
-                canonical_name=display_name,  # Use full title with parentheses
-                youtube_music_url=row.get('youtube_music_url'),
-                youtube_video_id=video_id,
-                youtube_url=row.get('youtube_url'),
-                thumbnail_url=row.get('thumbnail_url'),
-                
-                # Variant info (will be linked in second pass)
-                is_original=row.get('is_original', True),
-                variant_type=row.get('variant_type'),
-                
-                # Language
-                language=row.get('language', 'korean'),
-                
-                # Duration
-                duration_ms=row.get('duration_ms'),
-                duration_seconds=row.get('duration_seconds'),
-                
-                # Artist
-                artist_name=row.get('artists', 'TWICE'),
-                
-                # Category
-                category=self.detect_category(row.get('artists', 'TWICE')),
-                
-                # Glicko-2 (initial values)
-                rating=float(initial_elo),
-                rating_deviation=350.0,
-                volatility=0.06,
-                
-                # User flags
-                is_liked=video_id in preferences['liked'],
-                is_familiar=video_id in preferences['familiar'],
-            )
+            # Duration
+            'duration_ms': column('duration_ms'),
+            'duration_seconds': column('duration_seconds'),
+            
+            # Artist and category
+            'artist_name': artists,
+            'category': self.detect_categories(artists),
             
-            session.add(song)
-            songs_created += 1
+            # Glicko-2 (initial values)
+            'rating': initial_elos,
+            'rating_deviation': 350.0,
+            'volatility': 0.06,
+            
+            # User flags
+            'is_liked': video_ids.isin(preferences['liked']),
+            'is_familiar': video_ids.isin(preferences['familiar']),
+        }).to_dict('records')
+        
+        # Single executemany INSERT; skips per-object unit-of-work bookkeeping
+        session.bulk_insert_mappings(Song, song_records)
+        
+        return Counter(
+            pd.DataFrame({'source': elo_sources, 'rating': initial_elos})
+            .value_counts()
+            .to_dict()
+        )
+    
+    def insert_songs(self, session, song_chunks: Iterable[pd.DataFrame], preferences: dict) -> pd.DataFrame:
+        """
+        Insert songs chunk by chunk, then link variants to originals
         
-        session.commit()
+        Only the columns needed for linking are kept across chunks, so peak
+        memory is bounded by the chunk size rather than the CSV width.
         
-        logger.info(f"   ✅ Created {songs_created} songs")
+        Returns:
+            DataFrame of video_id/is_original/original_video_id/album/song_id
+            for every song (song_id resolved once here for album linking too)
+        """
+        logger.info("\n📀 Inserting songs...")
+        
+        elo_distribution = Counter()
+        link_columns = []
+        
+        for songs_df in song_chunks:
+            elo_distribution.update(self.insert_song_chunk(session, songs_df, preferences))
+            link_columns.append(songs_df.reindex(columns=SONG_LINK_COLUMNS))
+        
+        songs_df = pd.concat(link_columns, ignore_index=True)
+        songs_df['is_original'] = songs_df['is_original'].fillna(True).astype(bool)
+        
+        logger.info(f"   ✅ Created {len(songs_df)} songs")
         logger.info(f"\n   📊 Initial Elo distribution:")
-        for source, count in sorted(elo_distribution.items()):
-            elo = self.elo_boosts.get(source, 1500)
-            logger.info(f"      {source}: {count} songs @ {elo} Elo")
+        for (source, elo), count in sorted(elo_distribution.items()):
+            logger.info(f"      {source}: {count} songs @ {elo:.0f} Elo")
         
         # Second pass: Link variants to originals
         logger.info(f"\n🔗 Linking variants to originals...")
-        variants_linked = 0
-        
-        for _, row in songs_df.iterrows():
-            if not row.get('is_original', True) and pd.notna(row.get('original_video_id')):
-                variant_video_id = row.get('video_id')
-                original_video_id = row.get('original_video_id')
-                
-                # Find both songs in database
-                variant_song = session.query(Song).filter_by(youtube_video_id=variant_video_id).first()
-                original_song = session.query(Song).filter_by(youtube_video_id=original_video_id).first()
-                
-                if variant_song and original_song:
-                    variant_song.original_song_id = original_song.song_id
-                    variants_linked += 1
-        
-        session.commit()
+        
+        # One query for every song's ID instead of two lookups per variant
+        song_id_by_video_id = dict(session.query(Song.youtube_video_id, Song.song_id).all())
+        songs_df['song_id'] = songs_df['video_id'].map(song_id_by_video_id)
+        
+        is_variant = ~songs_df['is_original'] & songs_df['original_video_id'].notna()
+        variants = songs_df[is_variant]
+        variant_song_ids = variants['song_id']
+        original_song_ids = variants['original_video_id'].map(song_id_by_video_id)
+        resolved = variant_song_ids.notna() & original_song_ids.notna()
+        
+        variant_links = [
+            {'song_id': int(variant_song_id), 'original_song_id': int(original_song_id)}
+            for variant_song_id, original_song_id
+            in zip(variant_song_ids[resolved], original_song_ids[resolved])
+        ]
+        
+        session.bulk_update_mappings(Song, variant_links)
+        variants_linked = len(variant_links)
         
         if variants_linked > 0:
             logger.info(f"   ✅ Linked {variants_linked} variants to originals")
+        
+        return songs_df
     
     def insert_albums(self, session, albums_df: pd.DataFrame, songs_df: pd.DataFrame):
         """
         Insert albums and link to songs
         
         Key: One song can appear on multiple albums
+        
+        songs_df is the frame returned by insert_songs (with song_id resolved)
         """
         logger.info("\n💿 Inserting albums...")
         
-        albums_created = 0
-        tracks_linked = 0
-        
-        # Create a lookup: album_name -> set of video_ids
-        album_tracks = {}
-        for _, row in songs_df.iterrows():
-            album = row.get('album', '')
-            video_id = row.get('video_id')
-            if album and video_id:
-                if album not in album_tracks:
-                    album_tracks[album] = []
-                album_tracks[album].append(video_id)
-        
-        for _, album_row in albums_df.iterrows():
-            album_name = album_row['album_name']
-            
-            # Create album
-            album = Album(
-                album_name=album_name,
-                album_type=album_row.get('album_type', 'ep'),
-                language=album_row.get('language', 'korean'),
-            )
-            session.add(album)
-            session.flush()
-            
-            albums_created += 1
+        # Create a lookup: album_name -> list of song_ids (in file order),
+        # using the IDs insert_songs already resolved
+        has_track = (songs_df['album'].fillna('') != '') & songs_df['video_id'].notna()
+        album_tracks = (
+            songs_df[has_track]
+            .groupby('album', sort=False)['song_id']
+            .apply(list)
+            .to_dict()
+        )
+        
+        # Create albums in one executemany, then read back their IDs in one query
+        album_records = pd.DataFrame({
+            'album_name': albums_df['album_name'],
+            'album_type': albums_df['album_type'] if 'album_type' in albums_df else 'ep',
+            'language': albums_df['language'] if 'language' in albums_df else 'korean',
+        }).to_dict('records')
+        session.bulk_insert_mappings(Album, album_records)
+        albums_created = len(album_records)
+        
+        album_id_by_name = dict(session.query(Album.album_name, Album.album_id).all())
+        
+        # Link songs to their albums
+        track_records = []
+        for album_name, song_ids in album_tracks.items():
+            album_id = album_id_by_name.get(album_name)
+            if album_id is None:
+                continue
             
-            # Link songs to this album
-            if album_name in album_tracks:
-                for track_num, video_id in enumerate(album_tracks[album_name], 1):
-                    # Find song in database
-                    song = session.query(Song).filter_by(youtube_video_id=video_id).first()
-                    
-                    if song:
-                        # Create album track link
-                        album_track = AlbumTrack(
-                            album_id=album.album_id,
-                            song_id=song.song_id,
-                            track_number=track_num,
-                            disc_number=1,
-                        )
-                        session.add(album_track)
-                        tracks_linked += 1
-        
-        session.commit()
+            for track_num, song_id in enumerate(song_ids, 1):
+                if pd.notna(song_id):
+                    # Stage album track link
+                    track_records.append(dict(
+                        album_id=album_id,
+                        song_id=int(song_id),
+                        track_number=track_num,
+                        disc_number=1,
+                    ))
+        
+        session.bulk_insert_mappings(AlbumTrack, track_records)
         
         logger.info(f"   ✅ Created {albums_created} albums")
-        logger.info(f"   ✅ Linked {tracks_linked} album tracks")
+        logger.info(f"   ✅ Linked {len(track_records)} album tracks")
     
     def insert_source_playlists(self, session):
         """Record which YTM playlists were used as sources"""
@@ -268,11 +370,9 @@ class ImprovedDatabaseInitializer:
             },
         ]
         
-        for pl in playlists:
-            ytm_playlist = YTMPlaylist(**pl, last_updated=datetime.utcnow())
-            session.add(ytm_playlist)
-        
-        session.commit()
+        # One executemany INSERT; every row shares the same timestamp
+        now = datetime.utcnow()
+        session.execute(insert(YTMPlaylist), [{**pl, 'last_updated': now} for pl in playlists])
         logger.info(f"   ✅ Recorded {len(playlists)} source playlists")
     
     def run(self):
@@ -300,35 +400,67 @@ class ImprovedDatabaseInitializer:
         
         # Load data
         logger.info("\n📥 Loading CSV data...")
-        songs_df = pd.read_csv(self.songs_file)
-        albums_df = pd.read_csv(self.albums_file)
-        logger.info(f"   ✅ Songs: {len(songs_df)}")
+        song_chunks = pd.read_csv(
+            self.songs_file,
+            usecols=lambda column: column in SONG_COLUMN_DTYPES,
+            dtype={column: dtype for column, dtype in SONG_COLUMN_DTYPES.items() if dtype},
+            engine='c',
+            chunksize=SONG_CHUNK_SIZE,
+        )
+        albums_df = pd.read_csv(
+            self.albums_file,
+            usecols=lambda column: column in ALBUM_COLUMN_DTYPES,
+            dtype=ALBUM_COLUMN_DTYPES,
+            engine='c',
+        )
+        logger.info(f"   ✅ Songs: streaming in chunks of {SONG_CHUNK_SIZE}")
         logger.info(f"   ✅ Albums: {len(albums_df)}")
         
         # Create database
         logger.info(f"\n🗄️  Creating database: {Config.DATABASE_URL}")
         engine = create_database(Config.DATABASE_URL)
-        session = get_session(engine)
+        configure_bulk_load(engine)
+        # One explicit commit per phase: no autoflush, and nothing is re-read
+        # after commit, so skip expiring the loaded objects
+        session = get_session(engine, autoflush=False, expire_on_commit=False)
         
         try:
             # Initialize parameters
             logger.info("\n⚙️  Initializing Glicko-2 parameters...")
-            initialize_parameters(session)
+            initialize_parameters(session, commit=False)
             
             # Insert data
-            self.insert_songs(session, songs_df, preferences)
+            songs_df = self.insert_songs(session, song_chunks, preferences)
             self.insert_albums(session, albums_df, songs_df)
             self.insert_source_playlists(session)
             
+            # All inserts land in one transaction: one journal sync, no partial loads
+            session.commit()
+            
+            # Refresh planner statistics so the new indexes get used
+            session.execute(text("ANALYZE"))
+            session.commit()
+            
             # Summary
             logger.info("\n" + "=" * 60)
             logger.info("✅ Database Initialization Complete!")
             logger.info("=" * 60)
             
-            # Stats
-            total_songs = session.query(Song).count()
-            total_albums = session.query(Album).count()
-            total_tracks = session.query(AlbumTrack).count()
+            # Stats: one round-trip for every total (album counts as scalar
+            # subqueries), one grouped by language
+            total_songs, originals, liked, familiar, total_albums, total_tracks = session.query(
+                func.count(Song.song_id),
+                func.count(case((Song.is_original == True, 1))),
+                func.count(case((Song.is_liked == True, 1))),
+                func.count(case((Song.is_familiar == True, 1))),
+                select(func.count()).select_from(Album).scalar_subquery(),
+                select(func.count()).select_from(AlbumTrack).scalar_subquery(),
+            ).one()
+            language_counts = dict(
+                session.query(Song.language, func.count(Song.song_id))
+                .group_by(Song.language)
+                .all()
+            )
             
             logger.info(f"\n📊 Database contents:")
             logger.info(f"   Songs: {total_songs}")
@@ -337,20 +469,17 @@ class ImprovedDatabaseInitializer:
             
             # Rating distribution
             logger.info(f"\n🎵 Song breakdown:")
-            originals = session.query(Song).filter_by(is_original=True).count()
-            variants = session.query(Song).filter_by(is_original=False).count()
+            variants = total_songs - originals
             logger.info(f"   Original songs: {originals}")
             logger.info(f"   Variants: {variants}")
             
             logger.info(f"\n🌍 Language distribution:")
             for lang in ['korean', 'japanese', 'english', 'instrumental']:
-                count = session.query(Song).filter_by(language=lang).count()
+                count = language_counts.get(lang, 0)
                 if count > 0:
                     logger.info(f"   {lang.capitalize()}: {count}")
             
             logger.info(f"\n⭐ Your personalized ratings:")
-            liked = session.query(Song).filter_by(is_liked=True).count()
-            familiar = session.query(Song).filter_by(is_familiar=True).count()
             logger.info(f"   Liked songs (1600 Elo): {liked}")
             logger.info(f"   Familiar songs (1550 Elo): {familiar}")
             
@@ -5,7 +5,10 @@ Database Backup and Reset Utility
 Manage database backups and resets for testing
 """
 
-import shutil
+import os
+import sqlite3
+from contextlib import closing
+from operator import itemgetter
 from pathlib import Path
 from datetime import datetime
 import sys
@@ -14,6 +17,16 @@ DB_PATH = Path("data/musicelo.db")
 BACKUP_DIR = Path("data/backups")
 
 
+def copy_database(source: Path, destination: Path):
+    """
+    Copy a SQLite database with the online backup API
+    
+    Consistent even while the app holds the database open, unlike a file copy
+    """
+    with closing(sqlite3.connect(source)) as src, closing(sqlite3.connect(destination)) as dst:
+        src.backup(dst, pages=1000)
+
+
 def backup_database():
     """Create timestamped backup of current database"""
     if not DB_PATH.exists():
@@ -27,7 +40,7 @@ def backup_database():
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     backup_path = BACKUP_DIR / f"musicelo_{timestamp}.db"
     
-    shutil.copy2(DB_PATH, backup_path)
+    copy_database(DB_PATH, backup_path)
     
     # Get file size
     size_mb = backup_path.stat().st_size / (1024 * 1024)
@@ -45,18 +58,27 @@ def list_backups():
         print("📂 No backups directory")
         return []
     
-    backups = sorted(BACKUP_DIR.glob("musicelo_*.db"), reverse=True)
+    # One directory read; parse each timestamp once and sort on it, newest first
+    with os.scandir(BACKUP_DIR) as it:
+        entries = [
+            (
+                datetime.strptime(entry.name[len("musicelo_"):-len(".db")], "%Y%m%d_%H%M%S"),
+                Path(entry.path),
+                entry.stat().st_size,
+            )
+            for entry in it
+            if entry.name.startswith("musicelo_") and entry.name.endswith(".db")
+        ]
+    entries.sort(key=itemgetter(0), reverse=True)
+    backups = [backup for _, backup, _ in entries]
     
     if not backups:
         print("📂 No backups found")
         return []
     
     print(f"\n📚 Available backups ({len(backups)}):")
-    for i, backup in enumerate(backups, 1):
-        size_mb = backup.stat().st_size / (1024 * 1024)
-        timestamp = backup.stem.replace("musicelo_", "")
-        # Parse timestamp for readable format
-        dt = datetime.strptime(timestamp, "%Y%m%d_%H%M%S")
+    for i, (dt, backup, size) in enumerate(entries, 1):
+        size_mb = size / (1024 * 1024)
         readable = dt.strftime("%Y-%m-%d %H:%M:%S")
         print(f"  {i}. {backup.name} ({size_mb:.2f} MB) - {readable}")
     
@@ -77,7 +99,7 @@ def restore_backup(backup_path: Path):
             backup_database()
     
     # Restore
-    shutil.copy2(backup_path, DB_PATH)
+    copy_database(backup_path, DB_PATH)
     print(f"✅ Database restored from: {backup_path.name}")
     
     return True
@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+"""
+Run the song processing steps in one process
+
+Chains script 02 (deduplicate & classify) into script 03 (album extraction),
+handing the DataFrame over directly instead of writing and re-parsing
+data/ytm_deduplicated.csv in between. Both steps still save their CSV
+outputs, so scripts 04 and 05 work unchanged.
+
+Usage:
+    python scripts/pipeline.py
+"""
+
+import importlib
+import sys
+from pathlib import Path
+
+# Numbered script names are not valid identifiers, so import them by string
+sys.path.insert(0, str(Path(__file__).parent))
+deduplicate_and_classify = importlib.import_module('02_deduplicate_and_classify')
+extract_album_info = importlib.import_module('03_extract_album_info')
+
+
+def main():
+    """Main entry point"""
+    input_file = Path('data/ytm_raw_tracks.csv')
+    output_file = Path('data/ytm_deduplicated.csv')
+    
+    if not input_file.exists():
+        print(f"❌ Input file not found: {input_file}")
+        print("   Run script 01 first: python scripts/01_fetch_ytm_playlists.py")
+        return
+    
+    processor = deduplicate_and_classify.ImprovedSongProcessor()
+    songs_df = processor.process_songs(input_file, output_file)
+    
+    extractor = extract_album_info.AlbumExtractor()
+    extractor.run(df=songs_df)
+
+
+if __name__ == '__main__':
+    main()
@@ -6,6 +6,7 @@ Creates auth file from cookie string
 """
 
 import json
+import os
 from pathlib import Path
 
 def setup_auth():
@@ -48,8 +49,10 @@ def setup_auth():
     output_file = Path("data/ytm_headers_auth.json")
     output_file.parent.mkdir(exist_ok=True)
     
-    with open(output_file, 'w') as f:
-        json.dump(auth_data, f, indent=2)
+    # Serialize once and swap the file in atomically (no half-written auth file)
+    tmp_file = output_file.with_suffix('.json.tmp')
+    tmp_file.write_bytes(json.dumps(auth_data, indent=2).encode('utf-8'))
+    os.replace(tmp_file, output_file)
     
     print(f"\n✅ Created: {output_file}")
     print(f"   Size: {len(cookie_string)} characters")
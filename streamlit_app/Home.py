@@ -24,7 +24,10 @@ st.set_page_config(
 )
 
 # Custom CSS
-st.markdown("""
+@st.cache_resource
+def page_css() -> str:
+    """Page stylesheet (built once and shared across sessions)"""
+    return """
 <style>
     .main-header {
         font-size: 3rem;
@@ -41,23 +44,28 @@ st.markdown("""
         font-size: 1.2rem;
         margin-bottom: 2rem;
     }
-    .stat-box {
+    [data-testid="stMetric"] {
         background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
         padding: 1.5rem;
         border-radius: 10px;
         color: white;
         text-align: center;
     }
-    .stat-number {
+    [data-testid="stMetric"] > div {
+        justify-content: center;
+    }
+    [data-testid="stMetricValue"] {
         font-size: 2.5rem;
         font-weight: bold;
     }
-    .stat-label {
+    [data-testid="stMetricLabel"] {
         font-size: 1rem;
         opacity: 0.9;
     }
 </style>
-""", unsafe_allow_html=True)
+"""
+
+st.markdown(page_css(), unsafe_allow_html=True)
 
 # Main header
 st.markdown('<h1 class="main-header">🎵 MusicElo</h1>', unsafe_allow_html=True)
@@ -71,8 +79,13 @@ def get_database():
 
 db = get_database()
 
+@st.cache_data(ttl=60)
+def load_statistics():
+    """Get collection statistics (cached; counts change slowly)"""
+    return db.get_statistics()
+
 # Get statistics
-stats = db.get_statistics()
+stats = load_statistics()
 
 # Welcome section
 st.markdown("---")
@@ -80,36 +93,16 @@ st.markdown("---")
 col1, col2, col3, col4 = st.columns(4)
 
 with col1:
-    st.markdown(f"""
-    <div class="stat-box">
-        <div class="stat-number">{stats['total_songs']}</div>
-        <div class="stat-label">Total Songs</div>
-    </div>
-    """, unsafe_allow_html=True)
+    st.metric("Total Songs", stats['total_songs'])
 
 with col2:
-    st.markdown(f"""
-    <div class="stat-box">
-        <div class="stat-number">{stats['total_comparisons']}</div>
-        <div class="stat-label">Comparisons</div>
-    </div>
-    """, unsafe_allow_html=True)
+    st.metric("Comparisons", stats['total_comparisons'])
 
 with col3:
-    st.markdown(f"""
-    <div class="stat-box">
-        <div class="stat-number">{stats['avg_rating']:.0f}</div>
-        <div class="stat-label">Avg Rating</div>
-    </div>
-    """, unsafe_allow_html=True)
+    st.metric("Avg Rating", f"{stats['avg_rating']:.0f}")
 
 with col4:
-    st.markdown(f"""
-    <div class="stat-box">
-        <div class="stat-number">{stats['max_rating']:.0f}</div>
-        <div class="stat-label">Top Rating</div>
-    </div>
-    """, unsafe_allow_html=True)
+    st.metric("Top Rating", f"{stats['max_rating']:.0f}")
 
 st.markdown("---")
 
@@ -8,14 +8,13 @@ import streamlit as st
 from pathlib import Path
 import sys
 import random
+from concurrent.futures import ThreadPoolExecutor
 
 # Add project root to path
 project_root = Path(__file__).parent.parent.parent
 sys.path.insert(0, str(project_root))
 
 from core.database.operations import DatabaseOperations
-from core.database.models import Song, Comparison
-from core.services.glicko2_service import Glicko2Calculator, Opponent
 from core.utils.security import escape_html, safe_youtube_embed
 
 st.set_page_config(
@@ -25,7 +24,10 @@ st.set_page_config(
 )
 
 # Custom CSS
-st.markdown("""
+@st.cache_resource
+def page_css() -> str:
+    """Page stylesheet (built once and shared across sessions)"""
+    return """
 <style>
     header {visibility: hidden;}
     #MainMenu {visibility: hidden;}
@@ -56,7 +58,9 @@ st.markdown("""
         padding: 1.5rem 0;
     }
 </style>
-""", unsafe_allow_html=True)
+"""
+
+st.markdown(page_css(), unsafe_allow_html=True)
 
 # Initialize
 @st.cache_resource
@@ -64,11 +68,76 @@ def get_database():
     return DatabaseOperations()
 
 @st.cache_resource
-def get_calculator():
-    return Glicko2Calculator()
+def get_writer():
+    """Single background thread for vote writes (keeps them in submission order)"""
+    return ThreadPoolExecutor(max_workers=1)
 
 db = get_database()
-calc = get_calculator()
+
+def wait_for_vote_write() -> bool:
+    """
+    Block until the last vote's background write has committed
+    
+    Cached counts and rankings are cleared only once the vote is stored, so
+    no page can re-cache the pre-vote ratings. A failed write is rolled back
+    from the session (result hidden, count restored) and reported.
+    
+    Returns:
+        False if the pending vote failed to save, else True
+    """
+    comp = st.session_state.last_comparison
+    if comp is None or 'write' not in comp:
+        return True
+    
+    try:
+        comp['recorded'] = comp['write'].result()
+        error = None if comp['recorded'] else "one of the songs no longer exists"
+    except Exception as e:
+        comp['recorded'] = None
+        error = str(e)
+    finally:
+        del comp['write']
+    
+    if error:
+        st.session_state.show_result = False
+        st.session_state.last_comparison = None
+        st.session_state.comparison_count -= 1
+        st.error(f"Your vote could not be saved: {error}")
+        return False
+    
+    st.cache_data.clear()  # Ratings changed: drop cached counts and rankings
+    return True
+
+def load_songs(pair: tuple):
+    """Get both songs of a pair in one query"""
+    songs = db.get_songs_view(list(pair))
+    return songs.get(pair[0]), songs.get(pair[1])
+
+@st.cache_resource(ttl=120)
+def matching_song_ids(language, category, is_original) -> tuple:
+    """
+    IDs of songs matching the duel filters; pairs are sampled from this
+    
+    A cache_resource (immutable tuple) so it survives the st.cache_data.clear()
+    after each vote: votes never change which songs match.
+    """
+    return tuple(db.get_song_ids(language=language, category=category, is_original=is_original))
+
+def vote_options(song_a, song_b) -> tuple:
+    """(label, help, outcome_a, outcome_type) for each vote button"""
+    name_a, name_b = song_a.canonical_name, song_b.canonical_name
+    return (
+        (f"🔥 {name_a} (Strong)", f"{name_a} is WAY better", 1.0, "landslide_a"),
+        (f"👍 {name_a} (Slight)", f"{name_a} is better", 0.75, "slight_a"),
+        ("🤝 Draw / Equal", "Both songs are equally good", 0.5, "draw"),
+        (f"👍 {name_b} (Slight)", f"{name_b} is better", 0.25, "slight_b"),
+        (f"🔥 {name_b} (Strong)", f"{name_b} is WAY better", 0.0, "landslide_b"),
+    )
+
+@st.cache_data(ttl=30)
+def load_progress():
+    """Total songs and comparisons for the sidebar (cleared with all cached data on vote and undo)"""
+    return db.get_progress_counts()
 
 # Page header
 st.title("⚔️ Duel Mode")
@@ -78,11 +147,16 @@ if 'comparison_count' not in st.session_state:
     st.session_state.comparison_count = 0
 if 'current_pair' not in st.session_state:
     st.session_state.current_pair = None
+if 'current_pair_songs' not in st.session_state:
+    st.session_state.current_pair_songs = None  # Reset whenever the pair or its ratings change
 if 'show_result' not in st.session_state:
     st.session_state.show_result = False
 if 'last_comparison' not in st.session_state:
     st.session_state.last_comparison = None
 
+# Full reruns read ratings and counts, so the last vote must be stored first
+wait_for_vote_write()
+
 # Sidebar
 with st.sidebar:
     st.header("⚙️ Settings")
@@ -115,12 +189,7 @@ with st.sidebar:
     
     st.markdown("---")
     st.subheader("📊 Your Progress")
-    session = db.Session()
-    try:
-        total_songs = session.query(Song).count()
-        total_comparisons = session.query(Comparison).filter_by(is_undone=False).count()
-    finally:
-        session.close()
+    total_songs, total_comparisons = load_progress()
     st.metric("Total Songs", total_songs)
     st.metric("Total Comparisons", total_comparisons)
     st.metric("This Session", st.session_state.comparison_count)
@@ -131,26 +200,27 @@ cat_filter = None if category_filter == "All" else category_filter
 
 # Get song pair
 if st.session_state.current_pair is None:
-    songs = db.search_songs(
-        language=lang_filter,
-        category=cat_filter,
-        is_original=None if variants_enabled else True
-    )
+    song_ids = matching_song_ids(lang_filter, cat_filter, None if variants_enabled else True)
     
-    if len(songs) < 2:
+    if len(song_ids) < 2:
         st.error("Not enough songs matching your filters. Try different settings.")
         st.stop()
     
-    song_a, song_b = random.sample(songs, 2)
-    st.session_state.current_pair = (song_a.song_id, song_b.song_id)
+    st.session_state.current_pair = tuple(random.sample(song_ids, 2))
+    st.session_state.current_pair_songs = None
 
-# Get songs
-song_a = db.get_song(st.session_state.current_pair[0])
-song_b = db.get_song(st.session_state.current_pair[1])
+# Get songs (kept in session state until the pair or its ratings change)
+if st.session_state.current_pair_songs is None:
+    st.session_state.current_pair_songs = load_songs(st.session_state.current_pair)
+    if all(st.session_state.current_pair_songs):
+        st.session_state.vote_options = vote_options(*st.session_state.current_pair_songs)
+song_a, song_b = st.session_state.current_pair_songs
 
 if not song_a or not song_b:
     st.error("Error loading songs. Please try again.")
+    matching_song_ids.clear()  # A song was removed since the ID list was cached
     st.session_state.current_pair = None
+    st.session_state.current_pair_songs = None
     st.stop()
 
 # Display songs (ALWAYS VISIBLE - songs stay on screen)
@@ -165,7 +235,12 @@ with col1:
     """, unsafe_allow_html=True)
     
     if song_a.youtube_video_id:
-        iframe = safe_youtube_embed(song_a.youtube_video_id, height=player_height)
+        iframe = safe_youtube_embed(
+            song_a.youtube_video_id,
+            height=player_height,
+            lazy=True,
+            privacy_enhanced=True
+        )
         if iframe:
             st.markdown(iframe, unsafe_allow_html=True)
         else:
@@ -192,7 +267,12 @@ with col2:
     """, unsafe_allow_html=True)
     
     if song_b.youtube_video_id:
-        iframe = safe_youtube_embed(song_b.youtube_video_id, height=player_height)
+        iframe = safe_youtube_embed(
+            song_b.youtube_video_id,
+            height=player_height,
+            lazy=True,
+            privacy_enhanced=True
+        )
         if iframe:
             st.markdown(iframe, unsafe_allow_html=True)
         else:
@@ -210,212 +290,129 @@ with col2:
 # Voting/Result buttons (where voting buttons are)
 st.markdown("---")
 
-if st.session_state.show_result and st.session_state.last_comparison:
-    # Show result in place of voting buttons
-    comp = st.session_state.last_comparison
-    
-    st.success("✅ Comparison recorded!")
-    
-    # Rating changes
-    col1, col2 = st.columns(2)
-    
-    with col1:
-        st.markdown(f"**{escape_html(comp['song_a_name'])}**")
-        delta_a = comp['song_a_new_rating'] - comp['song_a_old_rating']
-        st.metric("Rating", f"{comp['song_a_new_rating']:.0f}", f"{delta_a:+.0f}")
-    
-    with col2:
-        st.markdown(f"**{escape_html(comp['song_b_name'])}**")
-        delta_b = comp['song_b_new_rating'] - comp['song_b_old_rating']
-        st.metric("Rating", f"{comp['song_b_new_rating']:.0f}", f"{delta_b:+.0f}")
-    
-    st.markdown("---")
-    
-    # Action buttons (in place of voting buttons)
-    col1, col2, col3 = st.columns(3)
-    
-    with col1:
-        if st.button("↩️ Undo", type="secondary", use_container_width=True):
-            if comp['comparison_id']:
-                session = db.Session()
-                try:
-                    comparison = session.query(Comparison).filter_by(
-                        comparison_id=comp['comparison_id']
-                    ).first()
-                    
-                    if comparison:
-                        comparison.is_undone = True
-                        
-                        song_a_db = session.query(Song).filter_by(song_id=comparison.song_a_id).first()
-                        song_b_db = session.query(Song).filter_by(song_id=comparison.song_b_id).first()
-                        
-                        if song_a_db and song_b_db:
-                            # Revert ratings
-                            song_a_db.rating = comp['song_a_old_rating']
-                            song_a_db.rating_deviation = comp['song_a_old_rd']
-                            song_a_db.volatility = comp['song_a_old_vol']
-                            
-                            song_b_db.rating = comp['song_b_old_rating']
-                            song_b_db.rating_deviation = comp['song_b_old_rd']
-                            song_b_db.volatility = comp['song_b_old_vol']
-                            
-                            # Revert stats
-                            outcome = comparison.outcome
-                            if outcome == 1.0:
-                                song_a_db.wins -= 1
-                                song_b_db.losses -= 1
-                            elif outcome == 0.0:
-                                song_a_db.losses -= 1
-                                song_b_db.wins -= 1
-                            else:
-                                song_a_db.draws -= 1
-                                song_b_db.draws -= 1
-                            
-                            song_a_db.games_played -= 1
-                            song_b_db.games_played -= 1
-                        
-                        session.commit()
-                finally:
-                    session.close()
-                
+@st.fragment
+def outcome_panel(song_a, song_b):
+    """
+    Voting buttons, or the result of the last vote
+    
+    Runs as a fragment: voting and undo only rerun this panel, not the
+    players and sidebar above it. Changing the pair triggers a full rerun.
+    """
+    if st.session_state.show_result and st.session_state.last_comparison:
+        # Show result in place of voting buttons
+        comp = st.session_state.last_comparison
+
+        st.success("✅ Comparison recorded!")
+
+        # Rating changes
+        col1, col2 = st.columns(2)
+
+        with col1:
+            st.markdown(f"**{escape_html(comp['song_a_name'])}**")
+            st.metric("Rating", f"{comp['song_a_new_rating']:.0f}", f"{comp['delta_a']:+.0f}")
+
+        with col2:
+            st.markdown(f"**{escape_html(comp['song_b_name'])}**")
+            st.metric("Rating", f"{comp['song_b_new_rating']:.0f}", f"{comp['delta_b']:+.0f}")
+
+        st.markdown("---")
+
+        # Action buttons (in place of voting buttons)
+        col1, col2, col3 = st.columns(3)
+
+        with col1:
+            if st.button("↩️ Undo", type="secondary", use_container_width=True):
+                wait_for_vote_write()
+                recorded = comp['recorded']
+                if recorded is not None:
+                    db.undo_comparison(
+                        recorded.comparison_id,
+                        comp['song_a_id'],
+                        comp['song_b_id'],
+                        comp['outcome'],
+                        recorded.song_a_before,
+                        recorded.song_b_before
+                    )
+
+                    st.session_state.current_pair_songs = None
+                    st.cache_data.clear()  # Ratings changed: drop cached counts and rankings
+                    st.session_state.show_result = False
+                    st.session_state.last_comparison = None
+                    st.session_state.comparison_count -= 1
+                    st.rerun(scope="fragment")
+
+        with col2:
+            if st.button("➡️ Next Comparison", type="primary", use_container_width=True):
                 st.session_state.show_result = False
-                st.session_state.last_comparison = None
-                st.session_state.comparison_count -= 1
+                st.session_state.current_pair = None
                 st.rerun()
-    
-    with col2:
-        if st.button("➡️ Next Comparison", type="primary", use_container_width=True):
-            st.session_state.show_result = False
-            st.session_state.current_pair = None
-            st.rerun()
-    
-    with col3:
-        if st.button("📊 View Rankings", use_container_width=True):
-            st.switch_page("pages/3_📊_Rankings.py")
 
-else:
-    # Voting buttons
-    st.markdown("### 🎵 Which song do you prefer?")
-    
-    col1, col2, col3, col4, col5 = st.columns(5)
-    
-    def record_vote(outcome_a: float, outcome_b: float, label: str):
-        """Record comparison and update ratings"""
-        # Store old values
-        old_rating_a = song_a.rating
-        old_rd_a = song_a.rating_deviation
-        old_vol_a = song_a.volatility
-        
-        old_rating_b = song_b.rating
-        old_rd_b = song_b.rating_deviation
-        old_vol_b = song_b.volatility
-        
-        # Update ratings
-        result_a = calc.update_rating(
-            song_a.rating, song_a.rating_deviation, song_a.volatility,
-            opponents=[Opponent(
-                rating=song_b.rating,
-                rating_deviation=song_b.rating_deviation,
-                outcome=outcome_a
-            )]
-        )
-        
-        result_b = calc.update_rating(
-            song_b.rating, song_b.rating_deviation, song_b.volatility,
-            opponents=[Opponent(
-                rating=song_a.rating,
-                rating_deviation=song_a.rating_deviation,
-                outcome=outcome_b
-            )]
-        )
-        
-        # Update database
-        db.update_song_rating(song_a.song_id, result_a.rating, result_a.rating_deviation, result_a.volatility)
-        db.update_song_rating(song_b.song_id, result_b.rating, result_b.rating_deviation, result_b.volatility)
-        db.update_song_stats(song_a.song_id, outcome_a)
-        db.update_song_stats(song_b.song_id, outcome_b)
-        
-        # Record comparison
-        comparison = db.record_comparison(
-            song_a.song_id,
-            song_b.song_id,
-            outcome_a,
-            label,
-            (old_rating_a, old_rd_a, old_vol_a),
-            (result_a.rating, result_a.rating_deviation, result_a.volatility),
-            (old_rating_b, old_rd_b, old_vol_b),
-            (result_b.rating, result_b.rating_deviation, result_b.volatility),
-            comparison_mode='duel'
-        )
-        
-        # Store for display
-        st.session_state.last_comparison = {
-            'comparison_id': comparison.comparison_id,
-            'song_a_name': song_a.canonical_name,
-            'song_b_name': song_b.canonical_name,
-            'song_a_old_rating': old_rating_a,
-            'song_a_old_rd': old_rd_a,
-            'song_a_old_vol': old_vol_a,
-            'song_a_new_rating': result_a.rating,
-            'song_b_old_rating': old_rating_b,
-            'song_b_old_rd': old_rd_b,
-            'song_b_old_vol': old_vol_b,
-            'song_b_new_rating': result_b.rating,
-        }
-        
-        st.session_state.show_result = True
-        st.session_state.comparison_count += 1
-    
-    with col1:
-        if st.button(
-            f"🔥 {song_a.canonical_name} (Strong)",
-            use_container_width=True,
-            help=f"{song_a.canonical_name} is WAY better"
-        ):
-            record_vote(1.0, 0.0, "landslide_a")
-            st.rerun()
-    
-    with col2:
-        if st.button(
-            f"👍 {song_a.canonical_name} (Slight)",
-            use_container_width=True,
-            help=f"{song_a.canonical_name} is better"
-        ):
-            record_vote(0.75, 0.25, "slight_a")
-            st.rerun()
-    
-    with col3:
-        if st.button(
-            "🤝 Draw / Equal",
-            use_container_width=True,
-            help="Both songs are equally good"
-        ):
-            record_vote(0.5, 0.5, "draw")
-            st.rerun()
-    
-    with col4:
-        if st.button(
-            f"👍 {song_b.canonical_name} (Slight)",
-            use_container_width=True,
-            help=f"{song_b.canonical_name} is better"
-        ):
-            record_vote(0.25, 0.75, "slight_b")
-            st.rerun()
-    
-    with col5:
-        if st.button(
-            f"🔥 {song_b.canonical_name} (Strong)",
-            use_container_width=True,
-            help=f"{song_b.canonical_name} is WAY better"
+        with col3:
+            if st.button("📊 View Rankings", use_container_width=True):
+                if wait_for_vote_write():
+                    st.switch_page("pages/3_📊_Rankings.py")
+
+    else:
+        # Voting buttons
+        st.markdown("### 🎵 Which song do you prefer?")
+
+        col1, col2, col3, col4, col5 = st.columns(5)
+
+        def record_vote(outcome_a: float, label: str):
+            """Record comparison and update ratings"""
+            # Preview the new ratings locally so the result shows immediately
+            result_a, result_b = db.calculator.update_pair(
+                song_a.rating, song_a.rating_deviation, song_a.volatility,
+                song_b.rating, song_b.rating_deviation, song_b.volatility,
+                outcome_a
+            )
+
+            # Rate and store the result in the background (one transaction,
+            # from the current DB ratings); joined before the next full rerun
+            write = get_writer().submit(
+                db.record_and_apply_outcome,
+                song_a.song_id, song_b.song_id, outcome_a, label, comparison_mode='duel'
+            )
+
+            # Store for display
+            st.session_state.last_comparison = {
+                'write': write,
+                'song_a_id': song_a.song_id,
+                'song_b_id': song_b.song_id,
+                'outcome': outcome_a,
+                'song_a_name': song_a.canonical_name,
+                'song_b_name': song_b.canonical_name,
+                'song_a_new_rating': result_a.rating,
+                'song_b_new_rating': result_b.rating,
+                'delta_a': result_a.rating - song_a.rating,
+                'delta_b': result_b.rating - song_b.rating,
+            }
+
+            st.session_state.current_pair_songs = None
+            st.session_state.show_result = True
+            st.session_state.comparison_count += 1
+
+        for col, (label, help_text, outcome_a, outcome_type) in zip(
+            (col1, col2, col3, col4, col5), st.session_state.vote_options
         ):
-            record_vote(0.0, 1.0, "landslide_b")
+            with col:
+                if st.button(
+                    label,
+                    key=f"vote_{outcome_type}",
+                    use_container_width=True,
+                    help=help_text
+                ):
+                    record_vote(outcome_a, outcome_type)
+                    st.rerun(scope="fragment")
+
+        # Skip (only when not showing result)
+        st.markdown("---")
+        if st.button("⏭️ Skip This Pair", help="Get a new pair of songs"):
+            st.session_state.current_pair = None
             st.rerun()
-    
-    # Skip (only when not showing result)
-    st.markdown("---")
-    if st.button("⏭️ Skip This Pair", help="Get a new pair of songs"):
-        st.session_state.current_pair = None
-        st.rerun()
+
+
+outcome_panel(song_a, song_b)
 
 # Help
 with st.expander("ℹ️ How to use Duel Mode"):
@@ -7,6 +7,7 @@ Display and filter song rankings with export functionality
 import streamlit as st
 from pathlib import Path
 import sys
+import numpy as np
 import pandas as pd
 
 # Add project root to path
@@ -22,14 +23,48 @@ st.set_page_config(
     layout="wide",
 )
 
-# Hide Streamlit header
-st.markdown("""
+# Custom CSS
+@st.cache_resource
+def page_css() -> str:
+    """Page stylesheet (built once and shared across sessions)"""
+    return """
 <style>
     header {visibility: hidden;}
     #MainMenu {visibility: hidden;}
     footer {visibility: hidden;}
+    
+    .rank-card {
+        display: grid;
+        grid-template-columns: 1fr 6fr 2fr 2fr;
+        align-items: center;
+        gap: 1rem;
+        padding: 0.75rem 0;
+        border-bottom: 1px solid rgba(128, 128, 128, 0.3);
+    }
+    .rank-pos {
+        font-size: 2rem;
+        font-weight: bold;
+    }
+    .rank-title {
+        font-size: 1.4rem;
+        font-weight: bold;
+    }
+    .rank-artist {
+        font-style: italic;
+    }
+    .rank-label, .rank-meta {
+        font-size: 0.85rem;
+        opacity: 0.7;
+    }
+    .rank-value {
+        font-size: 1.8rem;
+    }
 </style>
-""", unsafe_allow_html=True)
+"""
+
+st.markdown(page_css(), unsafe_allow_html=True)
+
+MEDALS = {1: "🥇", 2: "🥈", 3: "🥉"}
 
 # Initialize database
 @st.cache_resource
@@ -38,6 +73,103 @@ def get_database():
 
 db = get_database()
 
+@st.cache_data(ttl=60)
+def load_rating_bounds():
+    """Lowest and highest rating (cached; cleared when Duel Mode records a vote)"""
+    return db.get_rating_bounds()
+
+@st.cache_data(ttl=60, max_entries=32)
+def load_rankings(
+    sort_field: str,
+    ascending: bool,
+    include_variants: bool,
+    min_games: int,
+    languages: tuple,
+    categories: tuple,
+    min_rating: float,
+    max_rating: float
+) -> pd.DataFrame:
+    """Rankings for one sort/filter combination (cached; cleared when Duel Mode records a vote)"""
+    return db.get_rankings_frame(
+        sort_by=sort_field,
+        ascending=ascending,
+        include_variants=include_variants,
+        min_games=min_games,
+        languages=list(languages),
+        categories=list(categories),
+        min_rating=min_rating,
+        max_rating=max_rating
+    )
+
+@st.cache_data(ttl=60, max_entries=8)
+def load_rankings_table(rankings_args: tuple) -> pd.DataFrame:
+    """Display table for one load_rankings() call, built column-wise (cached)"""
+    rows = load_rankings(*rankings_args)
+    games = rows['games_played']
+    win_pct = (rows['wins'] / games.where(games > 0) * 100).map("{:.1f}%".format)
+    
+    return pd.DataFrame({
+        'Rank': np.arange(1, len(rows) + 1),
+        'Song': rows['canonical_name'],
+        'Artist': rows['artist_name'],
+        'Rating': rows['rating'].round().astype(int).astype(str),
+        'Confidence': "±" + rows['rating_deviation'].round().astype(int).astype(str),
+        'Language': rows['language'].str.capitalize(),
+        'Category': rows['category'],
+        'Games': games,
+        'W-L-D': (
+            rows['wins'].astype(str) + "-"
+            + rows['losses'].astype(str) + "-"
+            + rows['draws'].astype(str)
+        ),
+        'Win %': win_pct.where(games > 0, "N/A"),
+        'YouTube': rows['youtube_music_url'].fillna(""),
+    })
+
+@st.cache_data(ttl=60, max_entries=8)
+def load_rankings_csv(rankings_args: tuple) -> bytes:
+    """CSV export of the rankings table, without the YouTube column (cached)"""
+    df_export = load_rankings_table(rankings_args).drop(columns=['YouTube'])
+    return df_export.to_csv(index=False).encode('utf-8')
+
+@st.cache_data(ttl=60, max_entries=8)
+def load_rankings_cards(rankings_args: tuple, limit: int = 50) -> str:
+    """Card view HTML for the first `limit` rankings, rendered as one markdown block (cached)"""
+    cards = []
+    rows = load_rankings(*rankings_args).head(limit).itertuples(index=False)
+    for rank, song in enumerate(rows, 1):
+        # Song title with YouTube link
+        title = escape_html(song.canonical_name)
+        if song.youtube_music_url:
+            title = f'<a href="{escape_html(song.youtube_music_url)}" target="_blank">{title}</a>'
+        
+        metadata_parts = [f"🌍 {escape_html(song.language.capitalize())}", f"📁 {escape_html(song.category)}"]
+        if song.variant_type:
+            metadata_parts.append(f"🔄 {escape_html(song.variant_type)}")
+        
+        if song.games_played > 0:
+            win_caption = f"🏆 Win: {song.wins / song.games_played * 100:.0f}%"
+        else:
+            win_caption = "🏆 No games"
+        
+        cards.append(
+            f'<div class="rank-card">'
+            f'<div class="rank-pos">{MEDALS.get(rank, f"#{rank}")}</div>'
+            f'<div><div class="rank-title">{title}</div>'
+            f'<div class="rank-artist">{escape_html(song.artist_name)}</div>'
+            f'<div class="rank-meta">{" • ".join(metadata_parts)}</div></div>'
+            f'<div><div class="rank-label">Rating</div>'
+            f'<div class="rank-value">{song.rating:.0f}</div>'
+            f'<div class="rank-meta">📊 ±{song.rating_deviation:.0f}</div></div>'
+            f'<div><div class="rank-label">Games</div>'
+            f'<div class="rank-value">{song.games_played}</div>'
+            f'<div class="rank-meta">{win_caption}</div></div>'
+            f'</div>'
+        )
+    
+    # No blank lines or indentation, so markdown keeps it as a single HTML block
+    return "".join(cards)
+
 # Page header
 st.title("📊 Song Rankings")
 st.markdown("**View and filter your personalized TWICE song rankings**")
@@ -46,54 +178,57 @@ st.markdown("**View and filter your personalized TWICE song rankings**")
 with st.sidebar:
     st.header("🔍 Filters")
     
-    # Sort options
-    sort_by = st.selectbox(
-        "Sort by",
-        ["Rating (High to Low)", "Rating (Low to High)", 
-         "Most Compared", "Alphabetical", "Rating Confidence"],
-        key="sort_by"
-    )
-    
-    # Language filter - default all
-    language_filter = st.multiselect(
-        "Language",
-        ["korean", "japanese", "english", "instrumental"],
-        default=["korean", "japanese", "english", "instrumental"]
-    )
-    
-    # Category filter - default all
-    category_filter = st.multiselect(
-        "Category",
-        ["TWICE", "Solo", "Subunit", "Collaboration"],
-        default=["TWICE", "Solo", "Subunit", "Collaboration"]
-    )
-    
-    # Include variants - default off
-    include_variants = st.checkbox("Include variants (remixes, etc.)", value=False)
-    
-    # Minimum comparisons
-    min_games = st.slider("Minimum comparisons", 0, 50, 5)
-    
-    # Rating range - get actual min/max from database
-    st.subheader("Rating Range")
-    all_songs = db.get_all_songs()
-    if all_songs:
-        actual_min = int(min(s.rating for s in all_songs))
-        actual_max = int(max(s.rating for s in all_songs))
+    # Filters apply together on submit, so typing in a field does not rerun the page
+    with st.form("filters"):
+        # Sort options
+        sort_by = st.selectbox(
+            "Sort by",
+            ["Rating (High to Low)", "Rating (Low to High)", 
+             "Most Compared", "Alphabetical", "Rating Confidence"],
+            key="sort_by"
+        )
         
-        min_rating = st.number_input("Min Rating", 
-                                     value=actual_min, 
-                                     min_value=0, 
-                                     max_value=3000, 
-                                     step=50)
-        max_rating = st.number_input("Max Rating", 
-                                     value=actual_max, 
-                                     min_value=0, 
-                                     max_value=3000, 
-                                     step=50)
-    else:
-        min_rating = 0
-        max_rating = 3000
+        # Language filter - default all
+        language_filter = st.multiselect(
+            "Language",
+            ["korean", "japanese", "english", "instrumental"],
+            default=["korean", "japanese", "english", "instrumental"]
+        )
+        
+        # Category filter - default all
+        category_filter = st.multiselect(
+            "Category",
+            ["TWICE", "Solo", "Subunit", "Collaboration"],
+            default=["TWICE", "Solo", "Subunit", "Collaboration"]
+        )
+        
+        # Include variants - default off
+        include_variants = st.checkbox("Include variants (remixes, etc.)", value=False)
+        
+        # Minimum comparisons
+        min_games = st.slider("Minimum comparisons", 0, 50, 5)
+        
+        # Rating range - get actual min/max from database
+        st.subheader("Rating Range")
+        rating_bounds = load_rating_bounds()
+        if rating_bounds:
+            actual_min, actual_max = (int(bound) for bound in rating_bounds)
+        
+            min_rating = st.number_input("Min Rating", 
+                                         value=actual_min, 
+                                         min_value=0, 
+                                         max_value=3000, 
+                                         step=50)
+            max_rating = st.number_input("Max Rating", 
+                                         value=actual_max, 
+                                         min_value=0, 
+                                         max_value=3000, 
+                                         step=50)
+        else:
+            min_rating = 0
+            max_rating = 3000
+    
+        st.form_submit_button("Apply", width="stretch")
     
     st.markdown("---")
     
@@ -117,51 +252,50 @@ elif "Confidence" in sort_by:
     sort_field = "rating_deviation"
     ascending = True  # Lower RD = higher confidence
 
-# Get rankings
-songs = db.get_rankings(
-    sort_by=sort_field,
-    ascending=ascending,
-    include_variants=include_variants,
-    min_games=min_games
+# Get rankings (all filters applied in SQL; an empty selection means no filter)
+filter_rating = bool(min_rating or max_rating < 3000)
+rankings_args = (
+    sort_field,
+    ascending,
+    include_variants,
+    min_games,
+    tuple(language_filter),
+    tuple(category_filter),
+    min_rating if filter_rating else None,
+    max_rating if filter_rating else None
 )
-
-# Apply additional filters
-if language_filter:
-    songs = [s for s in songs if s.language in language_filter]
-
-if category_filter:
-    songs = [s for s in songs if s.category in category_filter]
-
-if min_rating or max_rating < 3000:
-    songs = [s for s in songs if min_rating <= s.rating <= max_rating]
+rankings = load_rankings(*rankings_args)
 
 # Display stats
 st.markdown("---")
 
 col1, col2, col3, col4 = st.columns(4)
 
+if not rankings.empty:
+    # All three averages in one columnar reduction
+    avg_rating, avg_games, avg_rd = rankings[
+        ['rating', 'games_played', 'rating_deviation']
+    ].to_numpy(dtype=np.float64).mean(axis=0)
+
 with col1:
-    st.metric("Songs Shown", len(songs))
+    st.metric("Songs Shown", len(rankings))
 
 with col2:
-    if songs:
-        avg_rating = sum(s.rating for s in songs) / len(songs)
+    if not rankings.empty:
         st.metric("Avg Rating", f"{avg_rating:.0f}")
 
 with col3:
-    if songs:
-        avg_games = sum(s.games_played for s in songs) / len(songs)
+    if not rankings.empty:
         st.metric("Avg Comparisons", f"{avg_games:.1f}")
 
 with col4:
-    if songs:
-        avg_rd = sum(s.rating_deviation for s in songs) / len(songs)
+    if not rankings.empty:
         st.metric("Avg Confidence", f"±{avg_rd:.0f}")
 
 st.markdown("---")
 
 # Display rankings
-if not songs:
+if rankings.empty:
     st.warning("No songs match your filters. Try relaxing the criteria.")
 else:
     # View mode
@@ -173,23 +307,7 @@ else:
     
     if view_mode == "Table":
         # Table view with separate link column
-        df_data = []
-        for rank, song in enumerate(songs, 1):
-            df_data.append({
-                'Rank': rank,
-                'Song': song.canonical_name,
-                'Artist': song.artist_name,
-                'Rating': f"{song.rating:.0f}",
-                'Confidence': f"±{song.rating_deviation:.0f}",
-                'Language': song.language.capitalize(),
-                'Category': song.category,
-                'Games': song.games_played,
-                'W-L-D': f"{song.wins}-{song.losses}-{song.draws}",
-                'Win %': f"{(song.wins / song.games_played * 100):.1f}%" if song.games_played > 0 else "N/A",
-                'YouTube': song.youtube_music_url if song.youtube_music_url else "",
-            })
-        
-        df = pd.DataFrame(df_data)
+        df = load_rankings_table(rankings_args)
         
         st.dataframe(
             df,
@@ -211,13 +329,9 @@ else:
         
         # Export functionality
         if st.session_state.get('download_trigger', False):
-            # Remove YouTube column for CSV export
-            df_export = df.drop(columns=['YouTube'])
-            
-            csv = df_export.to_csv(index=False)
             st.download_button(
                 label="💾 Save CSV",
-                data=csv,
+                data=load_rankings_csv(rankings_args),
                 file_name="musicelo_rankings.csv",
                 mime="text/csv",
             )
@@ -227,92 +341,46 @@ else:
         # Card view - more compact
         st.markdown("### Top Rankings")
         
-        # Show top 50 in card view
-        display_songs = songs[:50]
+        # Show top 50 in card view, sent to the browser as one element
+        st.markdown(load_rankings_cards(rankings_args), unsafe_allow_html=True)
         
-        for rank, song in enumerate(display_songs, 1):
-            with st.container():
-                col1, col2, col3, col4 = st.columns([1, 6, 2, 2])
-                
-                with col1:
-                    # Rank with medal for top 3
-                    if rank == 1:
-                        st.markdown("# 🥇")
-                    elif rank == 2:
-                        st.markdown("# 🥈")
-                    elif rank == 3:
-                        st.markdown("# 🥉")
-                    else:
-                        st.markdown(f"## #{rank}")
-                
-                with col2:
-                    # Song title with YouTube link
-                    if song.youtube_music_url:
-                        st.markdown(f"### [{escape_html(song.canonical_name)}]({song.youtube_music_url})")
-                    else:
-                        st.markdown(f"### {escape_html(song.canonical_name)}")
-                    
-                    # Artist on its own line
-                    st.markdown(f"*{escape_html(song.artist_name)}*")
-                    
-                    # Metadata in caption row (aligned with ±RD and Win%)
-                    metadata_parts = [f"🌍 {song.language.capitalize()}", f"📁 {song.category}"]
-                    if song.variant_type:
-                        metadata_parts.append(f"🔄 {song.variant_type}")
-                    st.caption(" • ".join(metadata_parts))
-                
-                with col3:
-                    # Rating column
-                    st.metric("Rating", f"{song.rating:.0f}")
-                    st.caption(f"📊 ±{song.rating_deviation:.0f}")
-                
-                with col4:
-                    # Games column (aligned with rating)
-                    st.metric("Games", song.games_played)
-                    if song.games_played > 0:
-                        win_rate = song.wins / song.games_played * 100
-                        st.caption(f"🏆 Win: {win_rate:.0f}%")
-                    else:
-                        st.caption("🏆 No games")  # Consistent formatting
-                
-                st.markdown("---")
-        
-        if len(songs) > 50:
-            st.info(f"Showing top 50 of {len(songs)} songs. Use table view to see all.")
+        if len(rankings) > 50:
+            st.info(f"Showing top 50 of {len(rankings)} songs. Use table view to see all.")
 
 # Statistics section
 with st.expander("📈 Detailed Statistics"):
-    if songs:
+    if not rankings.empty:
         st.subheader("Rating Distribution")
         
-        # Create rating bins
-        ratings = [s.rating for s in songs]
-        rating_bins = pd.cut(ratings, bins=10)
-        rating_counts = rating_bins.value_counts().sort_index()
+        # Create rating bins (counts and edges in one pass)
+        counts, edges = np.histogram(rankings['rating'].to_numpy(), bins=10)
+        
+        # Enough decimals that every bin label is distinct, even for narrow ranges
+        decimals = max(0, int(np.ceil(-np.log10(edges[1] - edges[0]))))
         
         # Display as bar chart data
         chart_data = pd.DataFrame({
-            'Rating Range': [str(interval) for interval in rating_counts.index],
-            'Count': rating_counts.values
+            'Rating Range': [f"{low:.{decimals}f}-{high:.{decimals}f}" for low, high in zip(edges[:-1], edges[1:])],
+            'Count': counts
         })
         
         st.bar_chart(chart_data.set_index('Rating Range'))
         
         # Top performers
         st.subheader("🏆 Top 10 Songs")
-        top_10 = songs[:10]
+        top_10 = rankings.head(10).itertuples(index=False)
         for i, song in enumerate(top_10, 1):
             st.markdown(f"{i}. **{escape_html(song.canonical_name)}** - {song.rating:.0f} (±{song.rating_deviation:.0f})")
         
         # Most active
         st.subheader("🎯 Most Compared Songs")
-        most_active = sorted(songs, key=lambda s: s.games_played, reverse=True)[:10]
+        most_active = rankings.nlargest(10, 'games_played').itertuples(index=False)
         for i, song in enumerate(most_active, 1):
             st.markdown(f"{i}. **{escape_html(song.canonical_name)}** - {song.games_played} games")
         
         # Highest confidence (lowest RD)
         st.subheader("✅ Highest Confidence Ratings")
-        highest_conf = sorted(songs, key=lambda s: s.rating_deviation)[:10]
+        highest_conf = rankings.nsmallest(10, 'rating_deviation').itertuples(index=False)
         for i, song in enumerate(highest_conf, 1):
             st.markdown(f"{i}. **{escape_html(song.canonical_name)}** - ±{song.rating_deviation:.0f}")
 
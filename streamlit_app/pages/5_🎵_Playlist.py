@@ -12,6 +12,7 @@ Features:
 import streamlit as st
 from pathlib import Path
 import sys
+import heapq
 import random
 import re
 from datetime import datetime
@@ -21,8 +22,8 @@ project_root = Path(__file__).parent.parent.parent
 sys.path.insert(0, str(project_root))
 
 from core.database.operations import DatabaseOperations
-from core.database.models import Song, Comparison
-from core.services.glicko2_service import Glicko2Calculator, Opponent
+from core.database.models import Song
+from core.services.glicko2_service import Glicko2Calculator
 from core.utils.security import escape_html, safe_youtube_embed
 
 st.set_page_config(
@@ -32,7 +33,10 @@ st.set_page_config(
 )
 
 # CSS
-st.markdown("""
+@st.cache_resource
+def page_css() -> str:
+    """Page stylesheet (built once and shared across sessions)"""
+    return """
 <style>
     header {visibility: hidden;}
     #MainMenu {visibility: hidden;}
@@ -57,7 +61,9 @@ st.markdown("""
         margin-top: 0.2rem;
     }
 </style>
-""", unsafe_allow_html=True)
+"""
+
+st.markdown(page_css(), unsafe_allow_html=True)
 
 # Initialize
 @st.cache_resource
@@ -327,13 +333,16 @@ with tab1:
                 # Get songs based on mode
                 if mode == "🔍 Discover (Songs needing ratings)":
                     songs = db.search_songs(language=None, category=None, is_original=True, min_games=0)
-                    songs = sorted(songs, key=lambda s: (-s.rating_deviation, s.games_played))
-                    playlist_songs = songs[:playlist_length]
+                    # Partial selection instead of sorting every song
+                    playlist_songs = heapq.nsmallest(
+                        playlist_length, songs, key=lambda s: (-s.rating_deviation, s.games_played)
+                    )
                 
                 elif mode == "⭐ Favorites (Highly rated songs)":
                     songs = db.search_songs(language=None, category=None, is_original=True, min_games=5)
-                    songs = sorted(songs, key=lambda s: (-s.rating, s.rating_deviation))
-                    playlist_songs = songs[:playlist_length]
+                    playlist_songs = heapq.nsmallest(
+                        playlist_length, songs, key=lambda s: (-s.rating, s.rating_deviation)
+                    )
                 
                 elif mode == "🎲 Random Mix":
                     songs = db.search_songs(language=None, category=None, is_original=True, min_games=0)
@@ -389,6 +398,9 @@ with tab2:
         current_idx = st.session_state.current_index
         song_ids = playlist['songs']
         
+        # Every playlist song in one IN query (sidebar, current and previous song)
+        playlist_songs = db.get_songs(song_ids)
+        
         # Sidebar - Playlist panel
         with st.sidebar:
             st.subheader("📋 Playlist")
@@ -401,7 +413,7 @@ with tab2:
                     st.caption(f"⚠️ {playlist['ytm_skipped']} songs skipped")
             
             for i, song_id in enumerate(song_ids):
-                song = db.get_song(song_id)
+                song = playlist_songs[song_id]
                 if i < current_idx:
                     status = "✓"
                 elif i == current_idx:
@@ -414,7 +426,7 @@ with tab2:
         st.progress((current_idx + 1) / len(song_ids), text=f"Song {current_idx + 1} of {len(song_ids)}")
         
         # Current song - COMPACT HEADER
-        current_song = db.get_song(song_ids[current_idx])
+        current_song = playlist_songs[song_ids[current_idx]]
         
         st.markdown(f"""
         <div class="compact-song-header">
@@ -445,7 +457,7 @@ with tab2:
             
             if not st.session_state.vote_recorded:
                 # Voting interface
-                prev_song = db.get_song(song_ids[current_idx - 1])
+                prev_song = playlist_songs[song_ids[current_idx - 1]]
                 
                 col1, col2, col3, col4, col5 = st.columns(5)
                 
@@ -460,33 +472,15 @@ with tab2:
                     old_rd_curr = current_song.rating_deviation
                     old_vol_curr = current_song.volatility
                     
-                    # Update ratings
-                    result_prev = calc.update_rating(
+                    # Update ratings (both sides of the game in one pass)
+                    result_prev, result_curr = calc.update_pair(
                         prev_song.rating, prev_song.rating_deviation, prev_song.volatility,
-                        opponents=[Opponent(
-                            rating=current_song.rating,
-                            rating_deviation=current_song.rating_deviation,
-                            outcome=outcome_value
-                        )]
-                    )
-                    
-                    result_curr = calc.update_rating(
                         current_song.rating, current_song.rating_deviation, current_song.volatility,
-                        opponents=[Opponent(
-                            rating=prev_song.rating,
-                            rating_deviation=prev_song.rating_deviation,
-                            outcome=1.0 - outcome_value
-                        )]
+                        outcome_value
                     )
                     
-                    # Update database
-                    db.update_song_rating(prev_song.song_id, result_prev.rating, result_prev.rating_deviation, result_prev.volatility)
-                    db.update_song_rating(current_song.song_id, result_curr.rating, result_curr.rating_deviation, result_curr.volatility)
-                    db.update_song_stats(prev_song.song_id, outcome_value)
-                    db.update_song_stats(current_song.song_id, 1.0 - outcome_value)
-                    
-                    # Record comparison
-                    comparison = db.record_comparison(
+                    # Update both songs and record the comparison in one transaction
+                    comparison = db.apply_duel_outcome(
                         prev_song.song_id,
                         current_song.song_id,
                         outcome_value,
@@ -497,6 +491,7 @@ with tab2:
                         (result_curr.rating, result_curr.rating_deviation, result_curr.volatility),
                         comparison_mode='playlist'
                     )
+                    st.cache_data.clear()  # Ratings changed: drop cached counts and rankings
                     
                     # Store in session
                     st.session_state.playlist_comparisons.append({
@@ -504,6 +499,7 @@ with tab2:
                         'prev_song': prev_song.canonical_name,
                         'curr_song': current_song.canonical_name,
                         'outcome': outcome_label,
+                        'outcome_value': outcome_value,
                         'prev_delta': result_prev.rating - old_rating_prev,
                         'curr_delta': result_curr.rating - old_rating_curr,
                         'prev_new_rating': result_prev.rating,
@@ -601,50 +597,15 @@ with tab2:
                         if st.session_state.playlist_comparisons:
                             last_comp = st.session_state.playlist_comparisons[-1]
                             
-                            session = db.Session()
-                            try:
-                                comparison = session.query(Comparison).filter_by(
-                                    comparison_id=last_comp['comparison_id']
-                                ).first()
-                                
-                                if comparison:
-                                    comparison.is_undone = True
-                                    
-                                    prev_song_db = session.query(Song).filter_by(
-                                        song_id=last_comp['prev_song_id']
-                                    ).first()
-                                    curr_song_db = session.query(Song).filter_by(
-                                        song_id=last_comp['curr_song_id']
-                                    ).first()
-                                    
-                                    if prev_song_db and curr_song_db:
-                                        # Revert ratings
-                                        prev_song_db.rating = last_comp['prev_old_rating']
-                                        prev_song_db.rating_deviation = last_comp['prev_old_rd']
-                                        prev_song_db.volatility = last_comp['prev_old_vol']
-                                        
-                                        curr_song_db.rating = last_comp['curr_old_rating']
-                                        curr_song_db.rating_deviation = last_comp['curr_old_rd']
-                                        curr_song_db.volatility = last_comp['curr_old_vol']
-                                        
-                                        # Revert stats
-                                        outcome = comparison.outcome
-                                        if outcome == 1.0:
-                                            prev_song_db.wins -= 1
-                                            curr_song_db.losses -= 1
-                                        elif outcome == 0.0:
-                                            prev_song_db.losses -= 1
-                                            curr_song_db.wins -= 1
-                                        else:
-                                            prev_song_db.draws -= 1
-                                            curr_song_db.draws -= 1
-                                        
-                                        prev_song_db.games_played -= 1
-                                        curr_song_db.games_played -= 1
-                                    
-                                    session.commit()
-                            finally:
-                                session.close()
+                            if db.undo_comparison(
+                                last_comp['comparison_id'],
+                                last_comp['prev_song_id'],
+                                last_comp['curr_song_id'],
+                                last_comp['outcome_value'],
+                                (last_comp['prev_old_rating'], last_comp['prev_old_rd'], last_comp['prev_old_vol']),
+                                (last_comp['curr_old_rating'], last_comp['curr_old_rd'], last_comp['curr_old_vol'])
+                            ):
+                                st.cache_data.clear()  # Ratings changed: drop cached counts and rankings
                             
                             st.session_state.playlist_comparisons.pop()
                             st.session_state.vote_recorded = False
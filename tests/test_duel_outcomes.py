@@ -0,0 +1,177 @@
+"""
+Duel outcome write path test suite
+
+Run with: pytest tests/test_duel_outcomes.py -v
+"""
+
+import sys
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+import pytest
+from core.database.models import Song, Comparison
+from core.database.operations import DatabaseOperations
+from core.services.glicko2_service import Glicko2Calculator, Opponent
+
+
+SONG_COLUMNS = (
+    'rating', 'rating_deviation', 'volatility',
+    'confidence_interval_lower', 'confidence_interval_upper',
+    'games_played', 'wins', 'losses', 'draws',
+)
+
+
+@pytest.fixture
+def db():
+    """DatabaseOperations on a fresh in-memory SQLite database"""
+    return DatabaseOperations('sqlite://')
+
+
+@pytest.fixture
+def song_ids(db):
+    """Two songs that have already played a few games"""
+    ids = []
+    for name, rating, rd, volatility, record in [
+        ("Fancy", 1620.0, 120.0, 0.061, (5, 2, 1)),
+        ("Feel Special", 1480.0, 200.0, 0.058, (2, 4, 0)),
+    ]:
+        wins, losses, draws = record
+        song = db.add_song({
+            'canonical_name': name,
+            'rating': rating,
+            'rating_deviation': rd,
+            'volatility': volatility,
+            'games_played': wins + losses + draws,
+            'wins': wins,
+            'losses': losses,
+            'draws': draws,
+            **Song.confidence_interval(rating, rd),
+        })
+        ids.append(song.song_id)
+    return ids
+
+
+def snapshot(db, song_id):
+    """The stored rating, interval and record columns of one song"""
+    song = db.get_song(song_id)
+    return {column: getattr(song, column) for column in SONG_COLUMNS}
+
+
+class TestUpdatePair:
+    """Test the two-sided Glicko-2 update"""
+
+    @pytest.mark.parametrize("outcome_a", [1.0, 0.75, 0.5, 0.25, 0.0])
+    def test_matches_two_update_rating_calls(self, outcome_a):
+        """Should give the same result as updating each song separately"""
+        calc = Glicko2Calculator()
+        rating_a, rd_a, vol_a = 1620.0, 120.0, 0.061
+        rating_b, rd_b, vol_b = 1480.0, 200.0, 0.058
+
+        result_a, result_b = calc.update_pair(
+            rating_a, rd_a, vol_a, rating_b, rd_b, vol_b, outcome_a
+        )
+        expected_a = calc.update_rating(
+            rating_a, rd_a, vol_a, [Opponent(rating_b, rd_b, outcome_a)]
+        )
+        expected_b = calc.update_rating(
+            rating_b, rd_b, vol_b, [Opponent(rating_a, rd_a, 1.0 - outcome_a)]
+        )
+
+        for result, expected in [(result_a, expected_a), (result_b, expected_b)]:
+            assert result.rating == pytest.approx(expected.rating, abs=1e-9)
+            assert result.rating_deviation == pytest.approx(expected.rating_deviation, abs=1e-9)
+            assert result.volatility == pytest.approx(expected.volatility, abs=1e-12)
+
+
+class TestRecordAndUndo:
+    """Test recording a vote and undoing it"""
+
+    def test_record_updates_both_songs(self, db, song_ids):
+        """Should store the calculator's ratings and bump each song's record"""
+        song_a_id, song_b_id = song_ids
+        before_a, before_b = snapshot(db, song_a_id), snapshot(db, song_b_id)
+
+        recorded = db.record_and_apply_outcome(song_a_id, song_b_id, 1.0, 'landslide_a')
+
+        assert recorded is not None
+        after_a, after_b = snapshot(db, song_a_id), snapshot(db, song_b_id)
+        assert (after_a['rating'], after_a['rating_deviation'], after_a['volatility']) == recorded.song_a_after
+        assert (after_b['rating'], after_b['rating_deviation'], after_b['volatility']) == recorded.song_b_after
+        assert after_a['confidence_interval_lower'] == after_a['rating'] - 2 * after_a['rating_deviation']
+        assert after_a['games_played'] == before_a['games_played'] + 1
+        assert after_a['wins'] == before_a['wins'] + 1
+        assert after_b['losses'] == before_b['losses'] + 1
+        assert db.get_comparison_count() == 1
+
+    @pytest.mark.parametrize("outcome", [1.0, 0.75, 0.5, 0.25, 0.0])
+    def test_undo_restores_songs_exactly(self, db, song_ids, outcome):
+        """Should put rating, RD, volatility, interval and W/L/D back as they were"""
+        song_a_id, song_b_id = song_ids
+        before_a, before_b = snapshot(db, song_a_id), snapshot(db, song_b_id)
+
+        recorded = db.record_and_apply_outcome(song_a_id, song_b_id, outcome, 'test')
+        assert snapshot(db, song_a_id) != before_a
+
+        assert db.undo_comparison(
+            recorded.comparison_id, song_a_id, song_b_id, outcome,
+            recorded.song_a_before, recorded.song_b_before
+        )
+
+        assert snapshot(db, song_a_id) == before_a
+        assert snapshot(db, song_b_id) == before_b
+        assert db.get_comparison_count() == 0
+
+    def test_second_undo_is_noop(self, db, song_ids):
+        """Should refuse to undo the same comparison twice"""
+        song_a_id, song_b_id = song_ids
+        recorded = db.record_and_apply_outcome(song_a_id, song_b_id, 1.0, 'landslide_a')
+        undo_args = (
+            recorded.comparison_id, song_a_id, song_b_id, 1.0,
+            recorded.song_a_before, recorded.song_b_before
+        )
+
+        assert db.undo_comparison(*undo_args)
+        restored_a, restored_b = snapshot(db, song_a_id), snapshot(db, song_b_id)
+
+        assert not db.undo_comparison(*undo_args)
+        assert snapshot(db, song_a_id) == restored_a
+        assert snapshot(db, song_b_id) == restored_b
+
+    def test_undo_missing_comparison(self, db, song_ids):
+        """Should return False and leave songs alone for an unknown comparison"""
+        song_a_id, song_b_id = song_ids
+        before_a = snapshot(db, song_a_id)
+
+        assert not db.undo_comparison(
+            999, song_a_id, song_b_id, 1.0, (1500.0, 350.0, 0.06), (1500.0, 350.0, 0.06)
+        )
+        assert snapshot(db, song_a_id) == before_a
+
+    def test_apply_duel_outcome_then_undo(self, db, song_ids):
+        """Should apply precomputed ratings and undo them like a recorded vote"""
+        song_a_id, song_b_id = song_ids
+        before_a, before_b = snapshot(db, song_a_id), snapshot(db, song_b_id)
+        song_a_before = (before_a['rating'], before_a['rating_deviation'], before_a['volatility'])
+        song_b_before = (before_b['rating'], before_b['rating_deviation'], before_b['volatility'])
+
+        result_a, result_b = db.calculator.update_pair(*song_a_before, *song_b_before, 0.5)
+        comparison = db.apply_duel_outcome(
+            song_a_id, song_b_id, 0.5, 'draw',
+            song_a_before, (result_a.rating, result_a.rating_deviation, result_a.volatility),
+            song_b_before, (result_b.rating, result_b.rating_deviation, result_b.volatility),
+            comparison_mode='playlist'
+        )
+
+        assert isinstance(comparison, Comparison)
+        assert snapshot(db, song_a_id)['rating'] == result_a.rating
+        assert snapshot(db, song_a_id)['draws'] == before_a['draws'] + 1
+        assert snapshot(db, song_b_id)['draws'] == before_b['draws'] + 1
+
+        assert db.undo_comparison(
+            comparison.comparison_id, song_a_id, song_b_id, 0.5, song_a_before, song_b_before
+        )
+        assert snapshot(db, song_a_id) == before_a
+        assert snapshot(db, song_b_id) == before_b
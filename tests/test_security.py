@@ -139,6 +139,15 @@ class TestSafeIframe:
         assert 'width="50%"' in iframe
         assert 'height="300"' in iframe
         
+    def test_lazy_privacy_enhanced(self):
+        """Should lazy-load from the nocookie domain when requested"""
+        iframe = safe_youtube_embed("dQw4w9WgXcQ", lazy=True, privacy_enhanced=True)
+        assert 'loading="lazy"' in iframe
+        assert "youtube-nocookie.com/embed/dQw4w9WgXcQ" in iframe
+        
+        iframe_default = safe_youtube_embed("dQw4w9WgXcQ")
+        assert 'loading="lazy"' not in iframe_default
+        
     def test_no_script_injection(self):
         """Should not allow script injection via parameters"""
         iframe = safe_youtube_embed('"><script>alert("xss")</script><"')